@@ -1,11 +1,10 @@
 from pathlib import Path
 
-from asgikit.errors.websocket import WebSocketDisconnectError
-from asgikit.request import Request
-from asgikit.response import HTTPStatus, respond_file, respond_status
-from asgikit.websocket import WebSocket
+from asgikit.hub import Hub
+from asgikit.requests import Request
+from asgikit.responses import HTTPStatus, respond_file, respond_status
 
-clients: set[WebSocket] = set()
+hub = Hub()
 
 
 async def app(scope, receive, send):
@@ -28,15 +27,9 @@ async def app(scope, receive, send):
     await websocket.accept()
     print(f"[open] Client connected")
 
-    clients.add(websocket)
-
-    while True:
-        try:
-            message = await websocket.receive()
+    async with hub.connect(websocket):
+        async for message in websocket:
             print(f"[message] {message}")
-            for client in clients:
-                await client.send(message)
-        except WebSocketDisconnectError:
-            clients.remove(websocket)
-            print("[close] Client disconnected")
-            break
+            hub.broadcast(message)
+
+    print("[close] Client disconnected")
@@ -1,9 +1,13 @@
 __all__ = (
+    "cache",
+    "channels",
     "errors",
     "headers",
+    "hub",
     "util",
     "query",
     "requests",
     "responses",
+    "sse",
     "websockets",
 )
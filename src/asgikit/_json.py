@@ -1,5 +1,37 @@
-import pkgutil
+import asyncio
+import dataclasses
+import datetime
+import decimal
+import enum
 import os
+import pickle
+import pkgutil
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any
+
+from asgikit.util.executor import BlockingExecutor
+
+__all__ = (
+    "JsonCodec",
+    "json_default",
+    "register_json_codec",
+    "get_json_codec",
+    "set_json_codec",
+    "JsonOffloadStats",
+    "JSON_OFFLOAD_STATS",
+    "encode_json",
+    "decode_json",
+    "shutdown_json_offload",
+)
+
+AUTO_DETECT_CODECS = ("orjson", "msgspec", "ujson", "json")
+
+DEFAULT_JSON_OFFLOAD_THRESHOLD = "0"
+DEFAULT_JSON_OFFLOAD_MODE = "process"
+DEFAULT_JSON_OFFLOAD_WORKERS = "2"
 
 
 def _import(dotted_path: str):
@@ -9,22 +41,400 @@ def _import(dotted_path: str):
     return item
 
 
-if json_encoder := os.environ.get("ASGIKIT_JSON_ENCODER"):
-    if "," in json_encoder:
-        encoder, decoder = [
-            name.strip() for name in json_encoder.split(",", maxsplit=1)
-        ]
+def json_default(obj: Any) -> Any:
+    """Convert objects not supported by JSON encoders
+
+    Handles dataclasses, dates and times, UUID, Decimal, enums and sets
+    """
+
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (uuid.UUID, decimal.Decimal)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _probe_returns_bytes(encoder: Callable) -> bool:
+    try:
+        return isinstance(encoder({}), (bytes, bytearray))
+    except Exception:
+        return False
+
+
+def _probe_accepts_buffer(decoder: Callable) -> bool:
+    try:
+        decoder(memoryview(b"{}"))
+        return True
+    except Exception:
+        return False
+
+
+class JsonCodec:
+    """Pair of JSON encoder and decoder
+
+    `encode` always returns bytes, converting the output of encoders that return str.
+    `decode` passes `bytearray` and `memoryview` straight to decoders that accept them.
+    If `returns_bytes` or `accepts_buffer` are not given, they are detected by
+    calling the encoder and decoder.
+    """
+
+    __slots__ = ("name", "encoder", "decoder", "returns_bytes", "accepts_buffer")
+
+    def __init__(
+        self,
+        name: str,
+        encoder: Callable[[Any], bytes | str],
+        decoder: Callable[[bytes | str], Any],
+        *,
+        returns_bytes: bool = None,
+        accepts_buffer: bool = None,
+    ):
+        self.name = name
+        self.encoder = encoder
+        self.decoder = decoder
+        self.returns_bytes = (
+            returns_bytes
+            if returns_bytes is not None
+            else _probe_returns_bytes(encoder)
+        )
+        self.accepts_buffer = (
+            accepts_buffer
+            if accepts_buffer is not None
+            else _probe_accepts_buffer(decoder)
+        )
+
+    def encode(self, obj: Any) -> bytes:
+        data = self.encoder(obj)
+        return data if self.returns_bytes else data.encode("utf-8")
+
+    def decode(self, data: bytes | bytearray | memoryview | str) -> Any:
+        if not self.accepts_buffer and isinstance(data, (bytearray, memoryview)):
+            data = bytes(data)
+        return self.decoder(data)
+
+    def __repr__(self) -> str:
+        return f"JsonCodec({self.name!r})"
+
+
+def _orjson_codec() -> JsonCodec:
+    # pylint: disable = import-outside-toplevel
+    import orjson
+
+    # like the standard library, encode dict keys that are not str
+    options = orjson.OPT_NON_STR_KEYS
+
+    def encode(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=json_default, option=options)
+
+    return JsonCodec(
+        "orjson", encode, orjson.loads, returns_bytes=True, accepts_buffer=True
+    )
+
+
+def _msgspec_codec() -> JsonCodec:
+    # pylint: disable = import-outside-toplevel
+    import msgspec
+
+    encoder = msgspec.json.Encoder(enc_hook=json_default)
+    decoder = msgspec.json.Decoder()
+
+    return JsonCodec(
+        "msgspec",
+        encoder.encode,
+        decoder.decode,
+        returns_bytes=True,
+        accepts_buffer=True,
+    )
+
+
+def _ujson_codec() -> JsonCodec:
+    # pylint: disable = import-outside-toplevel
+    import ujson
+
+    def encode(obj: Any) -> str:
+        return ujson.dumps(obj, ensure_ascii=False, default=json_default)
+
+    return JsonCodec(
+        "ujson", encode, ujson.loads, returns_bytes=False, accepts_buffer=False
+    )
+
+
+def _stdlib_codec() -> JsonCodec:
+    # pylint: disable = import-outside-toplevel
+    import json
+
+    def encode(obj: Any) -> str:
+        return json.dumps(obj, default=json_default)
+
+    return JsonCodec(
+        "json", encode, json.loads, returns_bytes=False, accepts_buffer=False
+    )
+
+
+_CODEC_FACTORIES: dict[str, Callable[[], JsonCodec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "ujson": _ujson_codec,
+    "json": _stdlib_codec,
+}
+
+_CODECS: dict[str, JsonCodec] = {}
+
+
+def register_json_codec(codec: JsonCodec):
+    """Make the codec available by its name"""
+
+    _CODECS[codec.name] = codec
+
+
+def get_json_codec(codec: JsonCodec | str = None) -> JsonCodec:
+    """Return the codec with the given name, or the default codec
+
+    :raise ImportError: If the library of a builtin codec is not installed
+    :raise ValueError: If there is no codec with the given name
+    """
+
+    if isinstance(codec, JsonCodec):
+        return codec
+
+    if codec is None:
+        return _DEFAULT_CODEC
+
+    if found := _CODECS.get(codec):
+        return found
+
+    if factory := _CODEC_FACTORIES.get(codec):
+        created = factory()
+        _CODECS[codec] = created
+        return created
+
+    if codec == _DEFAULT_CODEC.name:
+        return _DEFAULT_CODEC
+
+    raise ValueError(f"Unknown JSON codec: {codec}")
+
+
+def set_json_codec(codec: JsonCodec | str):
+    """Set the codec used when no codec is given to the JSON functions
+
+    Meant to be called once, when the application starts
+    """
+
+    # pylint: disable = global-statement
+    global _DEFAULT_CODEC, JSON_ENCODER, JSON_DECODER
+
+    _DEFAULT_CODEC = get_json_codec(codec)
+    JSON_ENCODER = _DEFAULT_CODEC.encoder
+    JSON_DECODER = _DEFAULT_CODEC.decoder
+
+
+def _detect_codec() -> JsonCodec:
+    for name in AUTO_DETECT_CODECS:
+        try:
+            return get_json_codec(name)
+        except ImportError:
+            continue
+    raise RuntimeError("no JSON codec available")
+
+
+def _codec_from_env(json_encoder: str) -> JsonCodec:
+    name = json_encoder.strip()
+
+    if name in _CODEC_FACTORIES:
+        return get_json_codec(name)
+
+    if "," in name:
+        encoder, decoder = [item.strip() for item in name.split(",", maxsplit=1)]
     else:
-        name = json_encoder.strip()
         encoder = f"{name}:dumps"
         decoder = f"{name}:loads"
+
+    return JsonCodec(name, _import(encoder), _import(decoder))
+
+
+if json_encoder := os.environ.get("ASGIKIT_JSON_ENCODER"):
     try:
-        JSON_ENCODER = _import(encoder)
-        JSON_DECODER = _import(decoder)
+        _DEFAULT_CODEC = _codec_from_env(json_encoder)
     except ImportError as err:
         raise ValueError(f"Invalid ASGIKIT_JSON_ENCODER: {json_encoder}") from err
 else:
-    import json
+    _DEFAULT_CODEC = _detect_codec()
+
+# kept for compatibility, use `get_json_codec` instead
+JSON_ENCODER = _DEFAULT_CODEC.encoder
+JSON_DECODER = _DEFAULT_CODEC.decoder
+
+
+class JsonOffloadStats:
+    """Process wide counters and timings of JSON encoded or decoded outside the
+    event loop
+
+    Times are in seconds, from submitting the work until its result is available
+    """
+
+    __slots__ = (
+        "encodes",
+        "decodes",
+        "encode_time_total",
+        "encode_time_max",
+        "decode_time_total",
+        "decode_time_max",
+    )
+
+    def __init__(self):
+        self.encodes = 0
+        self.decodes = 0
+        self.encode_time_total = 0.0
+        self.encode_time_max = 0.0
+        self.decode_time_total = 0.0
+        self.decode_time_max = 0.0
+
+    def record_encode(self, elapsed: float):
+        self.encodes += 1
+        self.encode_time_total += elapsed
+        self.encode_time_max = max(self.encode_time_max, elapsed)
+
+    def record_decode(self, elapsed: float):
+        self.decodes += 1
+        self.decode_time_total += elapsed
+        self.decode_time_max = max(self.decode_time_max, elapsed)
+
+
+JSON_OFFLOAD_STATS = JsonOffloadStats()
+
+# payloads of this size or larger are processed outside the event loop, 0 disables it
+JSON_OFFLOAD_THRESHOLD = int(
+    os.getenv("ASGIKIT_JSON_OFFLOAD_THRESHOLD", DEFAULT_JSON_OFFLOAD_THRESHOLD)
+)
+
+# "process" for a process pool, "thread" for a thread pool, only useful with codecs
+# that release the GIL
+JSON_OFFLOAD_MODE = os.getenv("ASGIKIT_JSON_OFFLOAD_MODE", DEFAULT_JSON_OFFLOAD_MODE)
+
+JSON_OFFLOAD_WORKERS = int(
+    os.getenv("ASGIKIT_JSON_OFFLOAD_WORKERS", DEFAULT_JSON_OFFLOAD_WORKERS)
+)
+
+_OFFLOAD_EXECUTOR: Executor | BlockingExecutor | None = None
+
+
+def _offload_executor() -> Executor | BlockingExecutor:
+    # pylint: disable = global-statement
+    global _OFFLOAD_EXECUTOR
+
+    if _OFFLOAD_EXECUTOR is None:
+        if JSON_OFFLOAD_MODE == "thread":
+            _OFFLOAD_EXECUTOR = BlockingExecutor(
+                JSON_OFFLOAD_WORKERS, 0, "asgikit-json"
+            )
+        else:
+            _OFFLOAD_EXECUTOR = ProcessPoolExecutor(JSON_OFFLOAD_WORKERS)
+
+    return _OFFLOAD_EXECUTOR
+
+
+def shutdown_json_offload(wait: bool = True):
+    """Stop the workers used to process JSON outside the event loop
+
+    Meant to be called when the application shuts down. Workers are started again
+    if needed
+    """
+
+    # pylint: disable = global-statement
+    global _OFFLOAD_EXECUTOR
+
+    if _OFFLOAD_EXECUTOR is not None:
+        executor, _OFFLOAD_EXECUTOR = _OFFLOAD_EXECUTOR, None
+        executor.shutdown(wait)
+
+
+def _encode_with(codec: str | JsonCodec, content: Any) -> bytes:
+    return get_json_codec(codec).encode(content)
+
+
+def _decode_with(codec: str | JsonCodec, data: bytes | str) -> Any:
+    return get_json_codec(codec).decode(data)
+
+
+def _process_reference(codec: JsonCodec) -> str | JsonCodec:
+    # builtin codecs are created again by name in the worker processes, other codecs
+    # are sent to them, so their encoder and decoder must be module level functions
+    if codec.name in _CODEC_FACTORIES and _CODECS.get(codec.name) is codec:
+        return codec.name
+
+    try:
+        pickle.dumps(codec)
+    except (pickle.PicklingError, AttributeError, TypeError) as err:
+        raise ValueError(
+            f"JSON codec '{codec.name}' cannot be sent to worker processes"
+        ) from err
+
+    return codec
+
+
+async def _offload(codec: JsonCodec, encode: bool, arg: Any) -> Any:
+    executor = _offload_executor()
+
+    if isinstance(executor, BlockingExecutor):
+        return await executor.run(codec.encode if encode else codec.decode, arg)
+
+    reference = _process_reference(codec)
+    if not encode and not isinstance(arg, (bytes, str)):
+        arg = bytes(arg)
+
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, _encode_with if encode else _decode_with, reference, arg
+    )
+
+
+async def encode_json(
+    content: Any, codec: JsonCodec | str = None, *, offload: bool = False
+) -> bytes:
+    """Encode content as json
+
+    The size of the output is not known in advance, so the caller decides: content is
+    encoded outside the event loop if `offload` is true, regardless of
+    `ASGIKIT_JSON_OFFLOAD_THRESHOLD`
+
+    :raise ValueError: If offloading to worker processes with a codec that cannot be
+    sent to them
+    """
+
+    codec = get_json_codec(codec)
+
+    if not offload:
+        return codec.encode(content)
+
+    start = time.perf_counter()
+    data = await _offload(codec, True, content)
+    JSON_OFFLOAD_STATS.record_encode(time.perf_counter() - start)
+    return data
+
+
+async def decode_json(
+    data: bytes | bytearray | memoryview | str, codec: JsonCodec | str = None
+) -> Any:
+    """Decode json data
+
+    Data of `ASGIKIT_JSON_OFFLOAD_THRESHOLD` bytes or more is decoded outside the
+    event loop
+
+    :raise ValueError: If offloading to worker processes with a codec that cannot be
+    sent to them
+    """
+
+    codec = get_json_codec(codec)
+
+    if not JSON_OFFLOAD_THRESHOLD or len(data) < JSON_OFFLOAD_THRESHOLD:
+        return codec.decode(data)
 
-    JSON_ENCODER = json.dumps
-    JSON_DECODER = json.loads
+    start = time.perf_counter()
+    content = await _offload(codec, False, data)
+    JSON_OFFLOAD_STATS.record_decode(time.perf_counter() - start)
+    return content
@@ -0,0 +1,437 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from http import HTTPStatus
+
+from asgikit.asgi import AsgiReceive, AsgiScope, AsgiSend
+
+__all__ = (
+    "CapturedResponse",
+    "ResponseRecorder",
+    "ResponseCache",
+    "RequestCoalescer",
+)
+
+AsgiApp = Callable[[AsgiScope, AsgiReceive, AsgiSend], Awaitable]
+
+CACHEABLE_STATUS = frozenset(
+    {
+        HTTPStatus.OK,
+        HTTPStatus.NON_AUTHORITATIVE_INFORMATION,
+        HTTPStatus.NO_CONTENT,
+        HTTPStatus.MULTIPLE_CHOICES,
+        HTTPStatus.MOVED_PERMANENTLY,
+        HTTPStatus.NOT_FOUND,
+        HTTPStatus.GONE,
+    }
+)
+
+DEFAULT_COALESCE_VARY = (
+    "accept",
+    "accept-encoding",
+    "accept-language",
+    "authorization",
+    "cookie",
+)
+
+RE_MAX_AGE = re.compile(rb"(?:^|,)\s*(s-maxage|max-age)\s*=\s*\"?(\d+)\"?")
+
+# response directives allowing a shared cache to store responses to authorized
+# requests, as defined in RFC 9111 section 3.5
+RE_AUTHORIZED_CACHEABLE = re.compile(rb"public|s-maxage|must-revalidate")
+
+
+class CapturedResponse:
+    """Status, headers and body of a complete response
+
+    The response is replayed with new ASGI messages each time, so middleware changing
+    them does not affect the captured response
+    """
+
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(
+        self, status: int, headers: Iterable[tuple[bytes, bytes]], body: bytes
+    ):
+        self.status = status
+        self.headers: tuple[tuple[bytes, bytes], ...] = tuple(headers)
+        self.body = body
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(
+            len(name) + len(value) for name, value in self.headers
+        )
+
+    def header(self, name: bytes) -> bytes | None:
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return None
+
+    async def replay(self, send: AsgiSend):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status,
+                "headers": list(self.headers),
+            }
+        )
+        await send(
+            {
+                "type": "http.response.body",
+                "body": self.body,
+                "more_body": False,
+            }
+        )
+
+
+class ResponseRecorder:
+    """ASGI send wrapper that records the response while forwarding it
+
+    The recorded response is available in `captured` once the response finishes,
+    unless it could not be captured: it was sent using an extension such as
+    `http.response.pathsend`, or its body exceeded `max_body_size`.
+    """
+
+    __slots__ = (
+        "_send",
+        "max_body_size",
+        "_status",
+        "_headers",
+        "_body",
+        "_failed",
+        "captured",
+    )
+
+    def __init__(self, send: AsgiSend, max_body_size: int = None):
+        self._send = send
+        self.max_body_size = max_body_size
+        self._status: int | None = None
+        self._headers: list[tuple[bytes, bytes]] = []
+        self._body = bytearray()
+        self._failed = False
+        self.captured: CapturedResponse | None = None
+
+    async def __call__(self, message: dict):
+        self._record(message)
+        await self._send(message)
+
+    def _record(self, message: dict):
+        if self._failed:
+            return
+
+        match message["type"]:
+            case "http.response.start":
+                self._status = message["status"]
+                self._headers = list(message.get("headers", []))
+            case "http.response.body":
+                self._body.extend(message.get("body", b""))
+                if (
+                    self.max_body_size is not None
+                    and len(self._body) > self.max_body_size
+                ):
+                    self._fail()
+                elif not message.get("more_body", False):
+                    self.captured = CapturedResponse(
+                        self._status, self._headers, bytes(self._body)
+                    )
+                    self._body = bytearray()
+            case _:
+                self._fail()
+
+    def _fail(self):
+        self._failed = True
+        self._body = bytearray()
+
+
+def _request_header(scope: AsgiScope, name: bytes) -> bytes | None:
+    for key, value in scope.get("headers", ()):
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _max_age(cache_control: bytes | None) -> int | None:
+    if not cache_control:
+        return None
+
+    ages = dict(RE_MAX_AGE.findall(cache_control.lower()))
+    age = ages.get(b"s-maxage", ages.get(b"max-age"))
+    return int(age) if age is not None else None
+
+
+class ResponseCache:
+    """ASGI app wrapper that caches complete responses in memory
+
+    Responses to `GET` and `HEAD` requests are cached by method, path, query string
+    and the request headers named in the `Vary` header of the response. They are kept
+    for the `max-age` (or `s-maxage`) of their `Cache-Control` header, or for
+    `default_ttl` seconds if it is not present. Responses with `no-store`, `private`,
+    `Set-Cookie` or `Vary: *` are never cached.
+
+    Responses to requests with `Cache-Control: no-store` are not cached, and neither
+    are responses to requests with `Authorization`, unless the response has `public`,
+    `s-maxage` or `must-revalidate`. Requests with `Cookie` bypass the cache, unless
+    `cache_cookies` is set.
+
+    Entries are evicted in least recently used order when the cache holds more than
+    `max_size` bytes.
+    """
+
+    __slots__ = (
+        "app",
+        "max_size",
+        "max_entry_size",
+        "default_ttl",
+        "cache_cookies",
+        "hits",
+        "misses",
+        "evictions",
+        "_vary",
+        "_entries",
+        "_size",
+    )
+
+    def __init__(
+        self,
+        app: AsgiApp,
+        *,
+        max_size: int = 64 * 1024 * 1024,
+        max_entry_size: int = 1024 * 1024,
+        default_ttl: float = None,
+        cache_cookies: bool = False,
+    ):
+        self.app = app
+        self.max_size = max_size
+        self.max_entry_size = max_entry_size
+        self.default_ttl = default_ttl
+        self.cache_cookies = cache_cookies
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._vary: dict[tuple, tuple[bytes, ...]] = {}
+        self._entries: OrderedDict[tuple, tuple[CapturedResponse, float]] = (
+            OrderedDict()
+        )
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        """Total number of bytes held by the cache"""
+        return self._size
+
+    async def __call__(self, scope: AsgiScope, receive: AsgiReceive, send: AsgiSend):
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("GET", "HEAD")
+            or (not self.cache_cookies and _request_header(scope, b"cookie"))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        base_key = (scope["method"], scope["path"], scope.get("query_string", b""))
+
+        if entry := self.lookup(scope, base_key):
+            self.hits += 1
+            await entry.replay(send)
+            return
+
+        self.misses += 1
+
+        recorder = ResponseRecorder(send, self.max_entry_size)
+        await self.app(scope, receive, recorder)
+
+        if recorder.captured:
+            self.store(scope, base_key, recorder.captured)
+
+    def lookup(self, scope: AsgiScope, base_key: tuple) -> CapturedResponse | None:
+        if (vary := self._vary.get(base_key)) is None:
+            return None
+
+        key = self._key(scope, base_key, vary)
+        if (entry := self._entries.get(key)) is None:
+            return None
+
+        captured, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return captured
+
+    def store(self, scope: AsgiScope, base_key: tuple, captured: CapturedResponse):
+        if captured.status not in CACHEABLE_STATUS or captured.header(b"set-cookie"):
+            return
+
+        request_cache_control = _request_header(scope, b"cache-control")
+        if request_cache_control and b"no-store" in request_cache_control.lower():
+            return
+
+        cache_control = (captured.header(b"cache-control") or b"").lower()
+        if re.search(rb"no-store|private", cache_control):
+            return
+
+        if _request_header(scope, b"authorization") and not (
+            RE_AUTHORIZED_CACHEABLE.search(cache_control)
+        ):
+            return
+
+        ttl = _max_age(cache_control)
+        if ttl is None:
+            ttl = self.default_ttl
+
+        if (
+            ttl is None
+            or ttl <= 0
+            or captured.size > min(self.max_entry_size, self.max_size)
+        ):
+            return
+
+        vary_header = (captured.header(b"vary") or b"").lower()
+        vary = tuple(
+            sorted(name.strip() for name in vary_header.split(b",") if name.strip())
+        )
+        if b"*" in vary:
+            return
+
+        self._vary[base_key] = vary
+        key = self._key(scope, base_key, vary)
+
+        self._remove(key)
+        self._entries[key] = (captured, time.monotonic() + ttl)
+        self._size += captured.size
+
+        while self._size > self.max_size:
+            evicted_key = next(iter(self._entries))
+            self._remove(evicted_key)
+            self.evictions += 1
+
+        if len(self._vary) > 2 * len(self._entries) + 64:
+            base_keys = {key[:3] for key in self._entries}
+            self._vary = {k: v for k, v in self._vary.items() if k in base_keys}
+
+    @staticmethod
+    def _key(scope: AsgiScope, base_key: tuple, vary: tuple[bytes, ...]) -> tuple:
+        if not vary:
+            return base_key
+
+        headers = {}
+        for name, value in scope.get("headers", ()):
+            if (name := name.lower()) in vary:
+                headers[name] = (
+                    headers[name] + b"," + value if name in headers else value
+                )
+
+        return base_key + tuple(headers.get(name) for name in vary)
+
+    def _remove(self, key: tuple):
+        if entry := self._entries.pop(key, None):
+            self._size -= entry[0].size
+
+    def invalidate(self):
+        """Remove all entries"""
+
+        self._entries.clear()
+        self._vary.clear()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RequestCoalescer:
+    """ASGI app wrapper that runs a single handler for identical concurrent requests
+
+    While a `GET` or `HEAD` request is being handled, identical requests wait for it
+    and receive the same response, replayed from the messages it sent. Requests are
+    identical when they have the same method, path, query string and values for the
+    headers named in `vary`.
+
+    Waiting requests run the handler themselves if the response is not available
+    within `timeout` seconds, could not be captured, or sets cookies.
+    """
+
+    __slots__ = (
+        "app",
+        "timeout",
+        "max_body_size",
+        "vary",
+        "executions",
+        "coalesced",
+        "fallbacks",
+        "_in_flight",
+    )
+
+    def __init__(
+        self,
+        app: AsgiApp,
+        *,
+        timeout: float = 5.0,
+        max_body_size: int = 1024 * 1024,
+        vary: Iterable[str] = DEFAULT_COALESCE_VARY,
+    ):
+        self.app = app
+        self.timeout = timeout
+        self.max_body_size = max_body_size
+        self.vary = frozenset(name.lower().encode("latin-1") for name in vary)
+
+        self.executions = 0
+        self.coalesced = 0
+        self.fallbacks = 0
+
+        self._in_flight: dict[tuple, asyncio.Future] = {}
+
+    def _key(self, scope: AsgiScope) -> tuple:
+        headers = sorted(
+            (name.lower(), value)
+            for name, value in scope.get("headers", ())
+            if name.lower() in self.vary
+        )
+        return (
+            scope["method"],
+            scope["path"],
+            scope.get("query_string", b""),
+            tuple(headers),
+        )
+
+    async def __call__(self, scope: AsgiScope, receive: AsgiReceive, send: AsgiSend):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        key = self._key(scope)
+
+        if (in_flight := self._in_flight.get(key)) is not None:
+            try:
+                captured = await asyncio.wait_for(
+                    asyncio.shield(in_flight), self.timeout
+                )
+            except asyncio.TimeoutError:
+                captured = None
+
+            if captured and not captured.header(b"set-cookie"):
+                self.coalesced += 1
+                await captured.replay(send)
+                return
+
+            self.fallbacks += 1
+            self.executions += 1
+            await self.app(scope, receive, send)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.executions += 1
+
+        recorder = ResponseRecorder(send, self.max_body_size)
+        try:
+            await self.app(scope, receive, recorder)
+        finally:
+            del self._in_flight[key]
+            future.set_result(recorder.captured)
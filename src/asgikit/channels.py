@@ -0,0 +1,486 @@
+import abc
+import asyncio
+import os
+import struct
+from collections import deque
+from collections.abc import AsyncIterator
+from os import PathLike
+
+from asgikit.hub import Group, Hub
+from asgikit.sse import SSEChannel
+
+__all__ = (
+    "ChannelLayerError",
+    "ChannelSubscription",
+    "ChannelLayer",
+    "InMemoryChannelLayer",
+    "UnixSocketChannelLayer",
+    "UnixSocketBroker",
+    "encode_frame",
+    "FrameDecoder",
+)
+
+OP_PUBLISH = 1
+OP_SUBSCRIBE = 2
+OP_UNSUBSCRIBE = 3
+
+FLAG_TEXT = 1
+
+# payload size, operation, flags, channel size
+FRAME_HEADER = struct.Struct("!IBBH")
+
+READ_SIZE = 64 * 1024
+
+# pending bytes in the socket buffer before publishers wait for it to drain
+HIGH_WATER_MARK = 1024 * 1024
+
+# pending bytes in the socket buffer before the broker drops a slow client
+CLIENT_BUFFER_LIMIT = 16 * 1024 * 1024
+
+Frame = tuple[int, int, str, bytes]
+
+
+class ChannelLayerError(RuntimeError):
+    pass
+
+
+def encode_frame(op: int, channel: str, data: bytes | str = b"") -> bytes:
+    """Encode a frame of the channel layer protocol
+
+    A frame is a fixed size header followed by the channel name and the payload
+    """
+
+    flags = 0
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+        flags |= FLAG_TEXT
+
+    name = channel.encode("utf-8")
+    return FRAME_HEADER.pack(len(data), op, flags, len(name)) + name + data
+
+
+class FrameDecoder:
+    """Split a stream of bytes into frames"""
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> list[tuple[Frame, bytes]]:
+        """Return the frames completed by `data`, each with its encoded form"""
+
+        buffer = self._buffer
+        buffer.extend(data)
+
+        frames = []
+        offset = 0
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            size, op, flags, name_size = FRAME_HEADER.unpack_from(buffer, offset)
+            start = offset + FRAME_HEADER.size
+            end = start + name_size + size
+            if end > len(buffer):
+                break
+
+            channel = buffer[start : start + name_size].decode("utf-8")
+            payload = bytes(buffer[start + name_size : end])
+            frames.append(((op, flags, channel, payload), bytes(buffer[offset:end])))
+            offset = end
+
+        del buffer[:offset]
+        return frames
+
+
+def _decode_payload(flags: int, payload: bytes) -> bytes | str:
+    return str(payload, "utf-8") if flags & FLAG_TEXT else payload
+
+
+class ChannelSubscription:
+    """Async iterator over the messages published to a channel
+
+    If more than `queue_size` messages are pending, the oldest ones are discarded.
+    If the channel layer fails, the pending messages are returned and then the error
+    is raised.
+    """
+
+    __slots__ = ("_layer", "channel", "_pending", "_ready", "_error", "closed")
+
+    def __init__(self, layer: "ChannelLayer", channel: str, queue_size: int):
+        self._layer = layer
+        self.channel = channel
+        self._pending: deque[bytes | str] = deque(maxlen=queue_size)
+        self._ready = asyncio.Event()
+        self._error: ChannelLayerError | None = None
+        self.closed = False
+
+    def _push(self, data: bytes | str):
+        self._pending.append(data)
+        self._ready.set()
+
+    def _fail(self, error: ChannelLayerError):
+        self._error = error
+        self.closed = True
+        self._ready.set()
+
+    def close(self):
+        """Stop receiving messages"""
+
+        if not self.closed:
+            self.closed = True
+            self._ready.set()
+            self._layer._unsubscribe(self)
+
+    def __aiter__(self) -> AsyncIterator[bytes | str]:
+        return self
+
+    async def __anext__(self) -> bytes | str:
+        while not self._pending:
+            if self._error is not None:
+                raise self._error
+            if self.closed:
+                raise StopAsyncIteration()
+            self._ready.clear()
+            await self._ready.wait()
+
+        return self._pending.popleft()
+
+
+class ChannelLayer(abc.ABC):
+    """Publish messages to subscribers of named channels
+
+    Subclasses deliver messages to subscribers in other processes by implementing
+    `publish`, `_on_subscribe` and `_on_unsubscribe`
+
+    :param queue_size: Number of pending messages a subscription can hold
+    """
+
+    __slots__ = ("queue_size", "_subscriptions", "_error")
+
+    def __init__(self, queue_size: int = 1000):
+        self.queue_size = queue_size
+        self._subscriptions: dict[str, set[ChannelSubscription]] = {}
+        self._error: ChannelLayerError | None = None
+
+    @abc.abstractmethod
+    async def publish(self, channel: str, data: bytes | str):
+        """Publish a message to all subscribers of the channel
+
+        :raise ChannelLayerError: If the channel layer failed
+        """
+
+    def subscribe(self, channel: str) -> ChannelSubscription:
+        """Subscribe to the messages published to the channel
+
+        :raise ChannelLayerError: If the channel layer failed
+        """
+
+        if self._error is not None:
+            raise self._error
+
+        subscription = ChannelSubscription(self, channel, self.queue_size)
+
+        if (subscriptions := self._subscriptions.get(channel)) is None:
+            subscriptions = self._subscriptions[channel] = set()
+            self._on_subscribe(channel)
+
+        subscriptions.add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: ChannelSubscription):
+        subscriptions = self._subscriptions.get(subscription.channel)
+        if subscriptions is None:
+            return
+
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.channel]
+            self._on_unsubscribe(subscription.channel)
+
+    def _on_subscribe(self, channel: str):
+        pass
+
+    def _on_unsubscribe(self, channel: str):
+        pass
+
+    def _fail(self, error: ChannelLayerError):
+        """Fail the channel layer, waking all subscribers with the error"""
+
+        self._error = error
+        subscriptions = self._subscriptions
+        self._subscriptions = {}
+        for channel_subscriptions in subscriptions.values():
+            for subscription in channel_subscriptions:
+                subscription._fail(error)
+
+    def _deliver(self, channel: str, data: bytes | str):
+        for subscription in list(self._subscriptions.get(channel, ())):
+            subscription._push(data)
+
+    async def relay(self, channel: str, target: Hub | Group | SSEChannel):
+        """Forward the messages published to the channel to a hub, group or SSE channel
+
+        Runs until the subscription is closed
+        """
+
+        subscription = self.subscribe(channel)
+        try:
+            async for data in subscription:
+                if isinstance(target, SSEChannel):
+                    target.publish(data if isinstance(data, str) else data.decode())
+                else:
+                    target.broadcast(data)
+        finally:
+            subscription.close()
+
+    async def close(self):
+        """Close all subscriptions"""
+
+        for subscriptions in list(self._subscriptions.values()):
+            for subscription in list(subscriptions):
+                subscription.close()
+
+
+class InMemoryChannelLayer(ChannelLayer):
+    """Channel layer delivering messages to subscribers in the current process"""
+
+    __slots__ = ()
+
+    async def publish(self, channel: str, data: bytes | str):
+        self._deliver(channel, data)
+
+
+class _Outgoing:
+    """Frames written to a stream, flushed once per event loop iteration
+
+    If `limit` is set and more than `limit` bytes are pending in the socket buffer
+    after a flush, the stream is aborted
+    """
+
+    __slots__ = ("writer", "limit", "_buffer", "_scheduled", "flushes", "overflowed")
+
+    def __init__(self, writer: asyncio.StreamWriter, limit: int = 0):
+        self.writer = writer
+        self.limit = limit
+        self._buffer = bytearray()
+        self._scheduled = False
+        self.flushes = 0
+        self.overflowed = False
+
+    def write(self, frame: bytes):
+        self._buffer.extend(frame)
+        if not self._scheduled:
+            self._scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self):
+        self._scheduled = False
+        if not self._buffer or self.writer.is_closing():
+            self._buffer.clear()
+            return
+
+        self.writer.write(bytes(self._buffer))
+        self._buffer.clear()
+        self.flushes += 1
+
+        if self.limit and self.writer.transport.get_write_buffer_size() > self.limit:
+            # closing would wait for the pending data to be written
+            self.overflowed = True
+            self.writer.transport.abort()
+
+    async def drain(self):
+        transport = self.writer.transport
+        if transport.get_write_buffer_size() + len(self._buffer) > HIGH_WATER_MARK:
+            self.flush()
+            await self.writer.drain()
+
+
+class UnixSocketChannelLayer(ChannelLayer):
+    """Channel layer delivering messages to subscribers in other processes
+
+    Processes in the same host connect to a `UnixSocketBroker` listening on `path`.
+    Messages published in the same event loop iteration are sent to the broker in a
+    single write, and the broker sends them to each process in a single write.
+
+    Messages are delivered to subscribers in the current process without going
+    through the broker.
+
+    If the connection to the broker is lost, subscriptions raise `ChannelLayerError`
+    once their pending messages are consumed, and so do further calls to `publish`
+    and `subscribe`.
+    """
+
+    __slots__ = ("path", "_outgoing", "_reader", "_task", "_closing")
+
+    def __init__(self, path: str | PathLike[str], queue_size: int = 1000):
+        super().__init__(queue_size)
+        self.path = os.fspath(path)
+        self._outgoing: _Outgoing | None = None
+        self._reader: asyncio.StreamReader | None = None
+        self._task: asyncio.Task | None = None
+        self._closing = False
+
+    @property
+    def flushes(self) -> int:
+        """Number of writes to the broker"""
+        return self._outgoing.flushes if self._outgoing else 0
+
+    async def connect(self):
+        """Connect to the broker
+
+        Must be called before publishing
+        """
+
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        self._reader = reader
+        self._outgoing = _Outgoing(writer)
+
+        for channel in self._subscriptions:
+            self._outgoing.write(encode_frame(OP_SUBSCRIBE, channel))
+
+        self._task = asyncio.create_task(self._read())
+
+    async def _read(self):
+        decoder = FrameDecoder()
+        try:
+            while data := await self._reader.read(READ_SIZE):
+                for (op, flags, channel, payload), _ in decoder.feed(data):
+                    if op == OP_PUBLISH:
+                        self._deliver(channel, _decode_payload(flags, payload))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+
+        if not self._closing:
+            self._outgoing.writer.close()
+            self._fail(ChannelLayerError("connection to the broker was lost"))
+
+    async def publish(self, channel: str, data: bytes | str):
+        if self._error is not None:
+            raise self._error
+        if self._outgoing is None:
+            raise ChannelLayerError("channel layer is not connected")
+
+        self._deliver(channel, data)
+        self._outgoing.write(encode_frame(OP_PUBLISH, channel, data))
+        await self._outgoing.drain()
+
+    def _on_subscribe(self, channel: str):
+        if self._outgoing is not None:
+            self._outgoing.write(encode_frame(OP_SUBSCRIBE, channel))
+
+    def _on_unsubscribe(self, channel: str):
+        if self._outgoing is not None:
+            self._outgoing.write(encode_frame(OP_UNSUBSCRIBE, channel))
+
+    async def close(self):
+        self._closing = True
+        await super().close()
+
+        if self._outgoing is not None:
+            self._outgoing.flush()
+            self._outgoing.writer.close()
+            try:
+                await self._outgoing.writer.wait_closed()
+            except ConnectionError:
+                pass
+
+        if self._task is not None:
+            self._task.cancel()
+
+
+class UnixSocketBroker:
+    """Route messages between the channel layers of processes in the same host
+
+    Can run in its own process, with `asyncio.run(UnixSocketBroker(path).serve())`, or
+    in one of the worker processes.
+
+    Clients with more than `buffer_limit` bytes pending in their socket buffer are
+    disconnected, so a slow client cannot make the broker buffer without bounds.
+    """
+
+    __slots__ = ("path", "buffer_limit", "dropped", "_server", "_channels", "_clients")
+
+    def __init__(
+        self, path: str | PathLike[str], buffer_limit: int = CLIENT_BUFFER_LIMIT
+    ):
+        self.path = os.fspath(path)
+        self.buffer_limit = buffer_limit
+        self.dropped = 0
+        self._server: asyncio.Server | None = None
+        self._channels: dict[str, set[_Outgoing]] = {}
+        self._clients: dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    async def start(self):
+        """Start listening for connections
+
+        :raise OSError: If the socket path is in use
+        """
+
+        self._server = await asyncio.start_unix_server(self._handle, self.path)
+
+    async def serve(self):
+        """Start listening for connections and serve until cancelled"""
+
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if self._server is None or not self._server.is_serving():
+            # accepted while the broker was closing
+            writer.transport.abort()
+            return
+
+        outgoing = _Outgoing(writer, self.buffer_limit)
+        subscribed: set[str] = set()
+        decoder = FrameDecoder()
+        self._clients[writer] = asyncio.current_task()
+
+        try:
+            while data := await reader.read(READ_SIZE):
+                for (op, _, channel, _), raw in decoder.feed(data):
+                    if op == OP_PUBLISH:
+                        for target in self._channels.get(channel, ()):
+                            if target is not outgoing:
+                                target.write(raw)
+                    elif op == OP_SUBSCRIBE:
+                        subscribed.add(channel)
+                        self._channels.setdefault(channel, set()).add(outgoing)
+                    elif op == OP_UNSUBSCRIBE:
+                        subscribed.discard(channel)
+                        self._remove(channel, outgoing)
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.pop(writer, None)
+            for channel in subscribed:
+                self._remove(channel, outgoing)
+            if outgoing.overflowed:
+                self.dropped += 1
+            writer.close()
+
+    def _remove(self, channel: str, outgoing: _Outgoing):
+        if targets := self._channels.get(channel):
+            targets.discard(outgoing)
+            if not targets:
+                del self._channels[channel]
+
+    async def close(self):
+        """Stop listening, disconnect the clients and remove the socket file"""
+
+        if self._server is not None:
+            self._server.close()
+            # since python 3.12, `wait_closed` waits for the client connections,
+            # which are aborted since closing waits for slow clients to read
+            clients = list(self._clients.items())
+            for writer, _ in clients:
+                writer.transport.abort()
+            await self._server.wait_closed()
+            await asyncio.gather(*(task for _, task in clients), return_exceptions=True)
+            self._server = None
+
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
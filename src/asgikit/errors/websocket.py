@@ -1,6 +1,13 @@
 from asgikit.errors.asgi import AsgiError
 
-__all__ = ("WebSocketError", "WebSocketStateError", "WebSocketDisconnectError")
+__all__ = (
+    "WebSocketError",
+    "WebSocketStateError",
+    "WebSocketDisconnectError",
+    "WebSocketQueueFullError",
+    "WebSocketTimeoutError",
+    "WebSocketLimitError",
+)
 
 
 class WebSocketError(AsgiError):
@@ -15,3 +22,21 @@ class WebSocketDisconnectError(WebSocketError):
     def __init__(self, code: int):
         self.code = code
         super().__init__(f"client disconnected with code: {code}")
+
+
+class WebSocketQueueFullError(WebSocketError):
+    pass
+
+
+class WebSocketTimeoutError(WebSocketDisconnectError):
+    def __init__(self, code: int, reason: str):
+        self.code = code
+        self.reason = reason
+        WebSocketError.__init__(self, f"connection closed by {reason}")
+
+
+class WebSocketLimitError(WebSocketDisconnectError):
+    def __init__(self, code: int, reason: str):
+        self.code = code
+        self.reason = reason
+        WebSocketError.__init__(self, f"connection closed by {reason}")
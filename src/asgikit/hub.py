@@ -0,0 +1,302 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+from enum import StrEnum
+
+from asgikit.errors.websocket import WebSocketDisconnectError
+from asgikit.util.buffers import Buffer
+from asgikit.websockets import WebSocket
+
+__all__ = (
+    "SlowConsumerPolicy",
+    "Hub",
+    "Group",
+)
+
+# "policy violation", sent to consumers disconnected for falling behind
+SLOW_CONSUMER_CLOSE_CODE = 1008
+
+
+class SlowConsumerPolicy(StrEnum):
+    """What to do when a connection has `queue_size` pending messages
+
+    DROP: discard the new message for that connection
+    DISCONNECT: close the connection
+    CONFLATE: discard the oldest pending message
+    """
+
+    DROP = "drop"
+    DISCONNECT = "disconnect"
+    CONFLATE = "conflate"
+
+
+def _encode(data: Buffer | str | dict) -> dict:
+    return data if isinstance(data, dict) else WebSocket.encode(data)
+
+
+class _Member:
+    __slots__ = (
+        "hub",
+        "websocket",
+        "groups",
+        "_pending",
+        "_ready",
+        "_closing",
+        "_task",
+    )
+
+    def __init__(self, hub: "Hub", websocket: WebSocket):
+        self.hub = hub
+        self.websocket = websocket
+        self.groups: set["Group"] = set()
+        self._pending: deque[dict] = deque()
+        self._ready = asyncio.Event()
+        self._closing = False
+        self._task = asyncio.create_task(self._write())
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def push(self, message: dict):
+        if self._closing:
+            return
+
+        if len(self._pending) >= self.hub.queue_size:
+            match self.hub.policy:
+                case SlowConsumerPolicy.DROP:
+                    self.hub.dropped += 1
+                    return
+                case SlowConsumerPolicy.CONFLATE:
+                    self._pending.popleft()
+                    self.hub.dropped += 1
+                case SlowConsumerPolicy.DISCONNECT:
+                    self.hub.disconnected += 1
+                    self._closing = True
+                    self.hub._discard(self)
+                    self._task = asyncio.create_task(self._close())
+                    return
+
+        self._pending.append(message)
+        self._ready.set()
+
+    async def _write(self):
+        websocket = self.websocket
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+
+                while self._pending:
+                    if websocket.state != WebSocket.State.ACCEPTED:
+                        return
+                    await websocket.send_encoded(self._pending.popleft())
+        except Exception:  # pylint: disable = broad-exception-caught
+            # the connection is gone, the receiving side will notice
+            pass
+        finally:
+            self.hub._discard(self)
+
+    async def _close(self):
+        try:
+            if self.websocket.state == WebSocket.State.ACCEPTED:
+                await self.websocket.close(SLOW_CONSUMER_CLOSE_CODE, "slow consumer")
+        except Exception:  # pylint: disable = broad-exception-caught
+            pass
+
+    def cancel(self):
+        self._pending.clear()
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+
+
+class Group:
+    """Named set of connections of a `Hub`"""
+
+    __slots__ = ("hub", "name", "_members")
+
+    def __init__(self, hub: "Hub", name: str):
+        self.hub = hub
+        self.name = name
+        self._members: set[_Member] = set()
+
+    def add(self, websocket: WebSocket):
+        """Add the connection to the group, adding it to the hub if needed"""
+
+        member = self.hub._member(websocket)
+        self.hub._groups.setdefault(self.name, self)
+        self._members.add(member)
+        member.groups.add(self)
+
+    def discard(self, websocket: WebSocket):
+        """Remove the connection from the group"""
+
+        if member := self.hub._members.get(websocket):
+            self._discard(member)
+
+    def _discard(self, member: _Member):
+        self._members.discard(member)
+        member.groups.discard(self)
+
+        if not self._members:
+            self.hub._groups.pop(self.name, None)
+
+    def broadcast(self, data: Buffer | str | dict, *, exclude: WebSocket = None) -> int:
+        """Send data to all connections in the group
+
+        `data` can also be a message built by `WebSocket.encode` or
+        `WebSocket.encode_json`
+
+        Returns the number of connections the message was queued for
+        """
+
+        return self.hub._fan_out(self._members, _encode(data), exclude)
+
+    def __contains__(self, websocket: WebSocket) -> bool:
+        return self.hub._members.get(websocket) in self._members
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+
+class Hub:
+    """Broadcast messages to many WebSocket connections
+
+    Each message is encoded once and queued for every recipient, and each connection
+    has a writer task that sends its queued messages, so a slow connection does not
+    delay the others.
+
+    :param queue_size: Number of pending messages a connection can hold
+    :param policy: What to do when a connection has `queue_size` pending messages
+    """
+
+    __slots__ = (
+        "queue_size",
+        "policy",
+        "dropped",
+        "disconnected",
+        "_members",
+        "_groups",
+    )
+
+    def __init__(
+        self,
+        queue_size: int = 100,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.DROP,
+    ):
+        self.queue_size = queue_size
+        self.policy = policy
+
+        self.dropped = 0
+        self.disconnected = 0
+
+        self._members: dict[WebSocket, _Member] = {}
+        self._groups: dict[str, Group] = {}
+
+    @property
+    def connections(self) -> int:
+        return len(self._members)
+
+    def _member(self, websocket: WebSocket) -> _Member:
+        if (member := self._members.get(websocket)) is None:
+            member = _Member(self, websocket)
+            self._members[websocket] = member
+        return member
+
+    def _discard(self, member: _Member):
+        if self._members.get(member.websocket) is not member:
+            return
+
+        del self._members[member.websocket]
+        member.cancel()
+
+        for group in list(member.groups):
+            group._discard(member)
+
+    def _fan_out(
+        self, members: Iterable[_Member], message: dict, exclude: WebSocket | None
+    ) -> int:
+        count = 0
+        for member in list(members):
+            if member.websocket is not exclude:
+                member.push(message)
+                count += 1
+        return count
+
+    def add(self, websocket: WebSocket, *groups: str):
+        """Add an accepted connection to the hub and to the given groups"""
+
+        self._member(websocket)
+        for name in groups:
+            self.group(name).add(websocket)
+
+    def remove(self, websocket: WebSocket):
+        """Remove the connection from the hub and all its groups
+
+        Messages not sent yet are discarded
+        """
+
+        if member := self._members.get(websocket):
+            self._discard(member)
+
+    def group(self, name: str) -> Group:
+        """Return the group with the given name, creating it if needed"""
+
+        if (group := self._groups.get(name)) is None:
+            group = Group(self, name)
+            self._groups[name] = group
+        return group
+
+    def groups(self, websocket: WebSocket) -> set[str]:
+        """Return the names of the groups the connection is in"""
+
+        if member := self._members.get(websocket):
+            return {group.name for group in member.groups}
+        return set()
+
+    def broadcast(self, data: Buffer | str | dict, *, exclude: WebSocket = None) -> int:
+        """Send data to all connections in the hub
+
+        `data` can also be a message built by `WebSocket.encode` or
+        `WebSocket.encode_json`
+
+        Returns the number of connections the message was queued for
+        """
+
+        return self._fan_out(self._members.values(), _encode(data), exclude)
+
+    @asynccontextmanager
+    async def connect(self, websocket: WebSocket, *groups: str) -> AsyncIterator[None]:
+        """Keep the connection in the hub while in the context
+
+        `WebSocketDisconnectError` raised in the context is suppressed, so the context
+        can wrap the loop receiving messages from the connection
+        """
+
+        self.add(websocket, *groups)
+        try:
+            yield
+        except WebSocketDisconnectError:
+            pass
+        finally:
+            self.remove(websocket)
+
+    def pending(self, websocket: WebSocket) -> int:
+        """Return the number of messages queued for the connection"""
+
+        if member := self._members.get(websocket):
+            return member.pending
+        return 0
+
+    def close(self):
+        """Remove all connections"""
+
+        for member in list(self._members.values()):
+            self._discard(member)
+
+    def __contains__(self, websocket: WebSocket) -> bool:
+        return websocket in self._members
+
+    def __len__(self) -> int:
+        return len(self._members)
@@ -1,4 +1,3 @@
-import asyncio
 import re
 from collections.abc import AsyncIterable
 from http import HTTPMethod
@@ -8,7 +7,7 @@ from urllib.parse import parse_qs, unquote_plus
 
 from python_multipart import multipart
 
-from asgikit._json import JSON_DECODER
+from asgikit._json import JsonCodec, decode_json
 from asgikit.asgi import AsgiReceive, AsgiScope, AsgiSend
 from asgikit.constants import (
     ATTRIBUTES,
@@ -27,6 +26,7 @@ from asgikit.errors.http import ClientDisconnectError, RequestBodyAlreadyConsume
 from asgikit.headers import Headers
 from asgikit.query import Query
 from asgikit.responses import Response
+from asgikit.util.executor import run_blocking
 from asgikit.websockets import WebSocket
 
 __all__ = (
@@ -101,7 +101,8 @@ class Body:
         """iterate over the bytes of the request body
 
         :raise RequestBodyAlreadyConsumedError: If the request body is already consumed
-        :raise ClientDisconnectError: If the client is disconnected while reading the request body
+        :raise ClientDisconnectError: If the client is disconnected while reading the
+        request body
         """
 
         if self.is_consumed:
@@ -281,16 +282,27 @@ class Request:
         return item in self.attributes
 
 
-async def read_body(obj: Body | Request) -> bytes:
-    """Read the full request body"""
-
+async def _read_body_buffer(obj: Body | Request) -> bytes | bytearray:
     body = obj.body if isinstance(obj, Request) else obj
-    data = bytearray()
+    data: bytes | bytearray = b""
 
     async for chunk in body:
+        if not data:
+            data = chunk
+            continue
+
+        if not isinstance(data, bytearray):
+            data = bytearray(data)
         data.extend(chunk)
 
-    return bytes(data)
+    return data
+
+
+async def read_body(obj: Body | Request) -> bytes:
+    """Read the full request body"""
+
+    data = await _read_body_buffer(obj)
+    return bytes(data) if isinstance(data, bytearray) else data
 
 
 async def read_text(obj: Body | Request, encoding: str = None) -> str:
@@ -301,11 +313,20 @@ async def read_text(obj: Body | Request, encoding: str = None) -> str:
     return data.decode(encoding or body.charset)
 
 
-async def read_json(obj: Body | Request) -> dict | list:
-    """Read the full request body and parse it as json"""
+async def read_json(
+    obj: Body | Request, *, codec: JsonCodec | str = None
+) -> dict | list:
+    """Read the full request body and parse it as json
+
+    :param obj: The request or request body to read
+    :param codec: Codec, or name of the codec, to use instead of the default one
+
+    Bodies larger than `ASGIKIT_JSON_OFFLOAD_THRESHOLD` are parsed outside the event
+    loop
+    """
 
-    if data := await read_body(obj):
-        return JSON_DECODER(data)
+    if data := await _read_body_buffer(obj):
+        return await decode_json(data, codec)
     return {}
 
 
@@ -353,7 +374,7 @@ async def _read_form_multipart(
 
     async for data in body:
         # `parser.write` can potentially write to a file,
-        # therefore we need to call it using `asyncio.to_thread`
-        await asyncio.to_thread(parser.write, data)
+        # therefore we need to call it in the executor for blocking operations
+        await run_blocking(parser.write, data)
 
     return fields | files
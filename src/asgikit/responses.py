@@ -1,19 +1,17 @@
 import asyncio
-import mimetypes
+import mmap
 import os
-from collections.abc import AsyncIterable
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, AsyncIterable, Iterable
 from contextlib import asynccontextmanager
-from email.utils import formatdate
 from enum import StrEnum
 from http import HTTPStatus
 from http.cookies import SimpleCookie
 from os import PathLike
 from typing import Any
 
-import aiofiles
-import aiofiles.os
-
-from asgikit._json import JSON_ENCODER
+from asgikit._json import JsonCodec, encode_json, get_json_codec
 from asgikit.asgi import AsgiReceive, AsgiScope, AsgiSend
 from asgikit.constants import (
     CONTENT_LENGTH,
@@ -34,27 +32,56 @@ from asgikit.errors.http import (
     ResponseNotStartedError,
 )
 from asgikit.headers import MutableHeaders
+from asgikit.util.async_file import AsyncFile, _exec
+from asgikit.util.buffers import Buffer, to_buffer
+from asgikit.util.file_cache import (
+    FILE_CONTENT_CACHE,
+    FILE_DESCRIPTOR_CACHE,
+    FILE_METADATA_CACHE,
+    FileMetadata,
+)
+from asgikit.util.threaded_iterator import ThreadedIterator
 
 __all__ = (
     "SameSitePolicy",
     "Response",
+    "StaticResponse",
+    "respond_static",
     "respond_text",
     "respond_status",
     "respond_redirect",
     "respond_redirect_post_get",
     "respond_json",
+    "JsonStreamMode",
+    "respond_json_stream",
     "respond_stream",
+    "ReadAhead",
     "respond_file",
     "stream_writer",
+    "StreamWriter",
+    "StreamStats",
+    "STREAM_STATS",
 )
 
 
+DEFAULT_RESPOND_FILE_MMAP = "false"
+
+RESPOND_FILE_MMAP = os.getenv(
+    "ASGIKIT_RESPOND_FILE_MMAP", DEFAULT_RESPOND_FILE_MMAP
+).lower() in ("1", "true", "yes")
+
+
 class SameSitePolicy(StrEnum):
     STRICT = "Strict"
     LAX = "Lax"
     NONE = "None"
 
 
+class JsonStreamMode(StrEnum):
+    ARRAY = "array"
+    NDJSON = "ndjson"
+
+
 class Response:
     """Represents the response associated with a request
 
@@ -225,13 +252,16 @@ class Response:
             }
         )
 
-    async def write(self, data: bytes | str, *, more_body=False):
+    async def write(self, data: Buffer | str, *, more_body=False):
         """Write data to the response
 
+        `data` can be `str` or any object supporting the buffer protocol,
+        which is copied to `bytes` unless `ZERO_COPY_BUFFERS` is enabled
+
         :raise ResponseNotStartedError: If the response is not started
         """
 
-        encoded_data = data if isinstance(data, bytes) else data.encode(self.encoding)
+        encoded_data = to_buffer(data, self.encoding)
 
         if not self.is_started:
             raise ResponseNotStartedError()
@@ -263,13 +293,83 @@ class Response:
         await self.write(b"", more_body=False)
 
 
-async def respond_text(response: Response, content: str | bytes):
+class StaticResponse:
+    """Response built once and sent many times
+
+    The status, headers and body are encoded when the object is created, so answering
+    a request only builds the two ASGI messages.
+    Useful for health checks, `robots.txt` and other constant responses.
+    """
+
+    __slots__ = ("status", "body", "headers")
+
+    def __init__(
+        self,
+        content: str | Buffer = b"",
+        *,
+        status: HTTPStatus = HTTPStatus.OK,
+        content_type: str = None,
+        headers: dict[str, str | list[str]] | MutableHeaders = None,
+        encoding: str = Response.ENCODING,
+    ):
+        body = to_buffer(content, encoding)
+
+        if not isinstance(headers, MutableHeaders):
+            headers = MutableHeaders(headers)
+
+        if content_type is None and isinstance(content, str):
+            content_type = "text/plain"
+
+        if content_type is not None:
+            if content_type.startswith("text/"):
+                content_type = f"{content_type}; charset={encoding}"
+            headers.set("content-type", content_type)
+
+        headers.set("content-length", str(len(body)))
+
+        self.status = status
+        self.body = body
+        self.headers: tuple[tuple[bytes, bytes], ...] = tuple(headers.encode())
+
+
+async def respond_static(response: Response, static: StaticResponse):
+    """Respond with the prebuilt status, headers and body of the given `StaticResponse`
+
+    New messages are sent on every call, so middleware changing them does not affect
+    other responses
+
+    Status and headers set on `response` are ignored
+
+    :raise ResponseAlreadyStartedError: If the response is already started
+    """
+
+    state = response._scope[SCOPE_ASGIKIT][RESPONSE]
+
+    if state[IS_STARTED]:
+        raise ResponseAlreadyStartedError()
+
+    state[IS_STARTED] = True
+    await response._send(
+        {
+            "type": "http.response.start",
+            "status": int(static.status),
+            "headers": list(static.headers),
+        }
+    )
+    await response._send(
+        {
+            "type": "http.response.body",
+            "body": static.body,
+            "more_body": False,
+        }
+    )
+    state[IS_FINISHED] = True
+
+
+async def respond_text(response: Response, content: str | Buffer):
     """Respond with the given content and finish the response"""
 
-    if isinstance(content, str):
-        data = content.encode(response.encoding)
-    else:
-        data = content
+    data = to_buffer(content, response.encoding)
 
     if not response.content_type:
         response.content_type = "text/plain"
@@ -310,19 +410,31 @@ async def respond_redirect(response: Response, location: str, permanent: bool =
 async def respond_redirect_post_get(response: Response, location: str):
     """Response with HTTP status 303
 
-    Used to send a redirect to a GET endpoint after a POST request, known as post-get redirect
+    Used to send a redirect to a GET endpoint after a POST request, known as post-get
+    redirect
     """
 
     response.header("location", location)
     await respond_status(response, HTTPStatus.SEE_OTHER)
 
 
-async def respond_json(response: Response, content: Any):
-    """Respond with the given content serialized as JSON"""
+async def respond_json(
+    response: Response,
+    content: Any,
+    *,
+    codec: JsonCodec | str = None,
+    offload: bool = False,
+):
+    """Respond with the given content serialized as JSON
+
+    :param response: The response to write to
+    :param content: Content to serialize
+    :param codec: Codec, or name of the codec, to use instead of the default one
+    :param offload: Serialize the content outside the event loop, meant for large
+    content
+    """
 
-    data = JSON_ENCODER(content)
-    if isinstance(data, str):
-        data = data.encode(response.encoding)
+    data = await encode_json(content, codec, offload=offload)
 
     response.content_type = "application/json"
     await respond_text(response, data)
@@ -335,44 +447,357 @@ async def __listen_for_disconnect(receive):
             return
 
 
+class StreamStats:
+    """Process wide counters of streams cancelled because the client disconnected"""
+
+    __slots__ = ("cancelled", "bytes_saved", "seconds_saved")
+
+    def __init__(self):
+        self.cancelled = 0
+        self.bytes_saved = 0
+        self.seconds_saved = 0.0
+
+    def record(self, writer: "StreamWriter"):
+        self.cancelled += 1
+        self.bytes_saved += writer.bytes_saved or 0
+        self.seconds_saved += writer.seconds_saved or 0.0
+
+
+STREAM_STATS = StreamStats()
+
+
+class StreamWriter:
+    """Writes data to a streaming response
+
+    Created by `stream_writer`. When `buffer_size` is set, written data is
+    coalesced and sent as a single message once the buffer reaches `buffer_size`
+    bytes, once `flush_interval` seconds have passed since the first buffered
+    write, or when `flush` is called.
+
+    `writes` counts the writes requested and `events` counts the body messages sent.
+
+    If the client disconnects while the stream is being written, the task writing
+    to the stream is cancelled right away and `cancelled` is set.
+    """
+
+    __slots__ = (
+        "_response",
+        "_client_disconnect",
+        "buffer_size",
+        "flush_interval",
+        "writes",
+        "events",
+        "bytes_sent",
+        "started_at",
+        "cancelled",
+        "_buffer",
+        "_lock",
+        "_timer",
+        "_flush_task",
+    )
+
+    def __init__(
+        self,
+        response: Response,
+        client_disconnect: asyncio.Future,
+        buffer_size: int = 0,
+        flush_interval: float = None,
+    ):
+        self._response = response
+        self._client_disconnect = client_disconnect
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+
+        self.writes = 0
+        self.events = 0
+        self.bytes_sent = 0
+        self.started_at = time.monotonic()
+        self.cancelled = False
+
+        self._buffer = bytearray()
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task | None = None
+
+    @property
+    def buffered(self) -> int:
+        """Number of bytes waiting to be sent"""
+        return len(self._buffer)
+
+    @property
+    def bytes_saved(self) -> int | None:
+        """Number of bytes not produced because the client disconnected
+
+        Only known when the response has a content length
+        """
+
+        if not self.cancelled or self._response.content_length is None:
+            return None
+        return max(int(self._response.content_length) - self.bytes_sent, 0)
+
+    @property
+    def seconds_saved(self) -> float | None:
+        """Estimated time not spent producing the bytes in `bytes_saved`
+
+        Extrapolated from the rate at which data was sent before the disconnect
+        """
+
+        if not (bytes_saved := self.bytes_saved) or not self.bytes_sent:
+            return None
+
+        elapsed = time.monotonic() - self.started_at
+        return elapsed * bytes_saved / self.bytes_sent
+
+    def _check_state(self):
+        if self._client_disconnect.done():
+            raise ClientDisconnectError()
+
+        if self._flush_task and self._flush_task.done():
+            task, self._flush_task = self._flush_task, None
+            if error := task.exception():
+                raise error
+
+    async def _send(self, data: Buffer):
+        self.events += 1
+        self.bytes_sent += len(data)
+        await self._response.write(data, more_body=True)
+
+    async def __call__(self, data: Buffer | str):
+        """Write data to the response
+
+        If `ZERO_COPY_BUFFERS` is enabled, objects supporting the buffer protocol
+        are sent without being copied, unless buffered, so they must not be
+        modified after being written
+
+        :raise ClientDisconnectError: If the client disconnects while sending data
+        """
+
+        self._check_state()
+        self.writes += 1
+
+        data = to_buffer(data, self._response.encoding)
+
+        if not self.buffer_size:
+            await self._send(data)
+            return
+
+        self._buffer.extend(data)
+
+        if len(self._buffer) >= self.buffer_size:
+            await self.flush()
+        elif self.flush_interval is not None and self._timer is None:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.flush_interval, self._flush_later)
+
+    def _flush_later(self):
+        self._timer = None
+        if not self._flush_task:
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """Send the buffered data, if any
+
+        :raise ClientDisconnectError: If the client disconnects while sending data
+        """
+
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        async with self._lock:
+            if not self._buffer:
+                return
+
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            await self._send(data)
+
+    async def _close(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        if self._flush_task:
+            task, self._flush_task = self._flush_task, None
+            await asyncio.gather(task, return_exceptions=True)
+
+
 @asynccontextmanager
-async def stream_writer(response: Response):
+async def stream_writer(
+    response: Response, *, buffer_size: int = 0, flush_interval: float = None
+):
     """Context manager for streaming data to the response
 
+    Yields a `StreamWriter`, which can be called to write data to the response.
+    If the client disconnects, the body of the context manager is cancelled,
+    wherever it is waiting, and `ClientDisconnectError` is raised.
+
+    :param response: The response to write to
+    :param buffer_size: Coalesce writes until this number of bytes is buffered.
+    If 0, every write is sent immediately
+    :param flush_interval: Maximum number of seconds data is kept in the buffer
     :raise ClientDisconnectError: If the client disconnects while sending data
     """
 
     await response.start()
 
+    task = asyncio.current_task()
     client_disconect = asyncio.create_task(__listen_for_disconnect(response._receive))
+    writer = StreamWriter(response, client_disconect, buffer_size, flush_interval)
+    is_writing = True
 
-    async def write(data: bytes | str):
-        if client_disconect.done():
-            raise ClientDisconnectError()
-        await response.write(data, more_body=True)
+    def on_disconnect(listener: asyncio.Task):
+        if listener.cancelled() or listener.exception() or not is_writing:
+            return
+        writer.cancelled = True
+        task.cancel()
+
+    client_disconect.add_done_callback(on_disconnect)
 
     try:
-        yield write
+        yield writer
+        if not client_disconect.done():
+            await writer.flush()
+        if writer.cancelled:
+            task.uncancel()
+            raise ClientDisconnectError()
+    except asyncio.CancelledError:
+        if writer.cancelled and task.uncancel() == 0:
+            raise ClientDisconnectError() from None
+        raise
     finally:
+        is_writing = False
+        if writer.cancelled:
+            STREAM_STATS.record(writer)
+        await writer._close()
         await response.end()
         client_disconect.cancel()
 
 
-async def respond_stream(response: Response, stream: AsyncIterable[bytes | str]):
-    """Respond with the given stream of data"""
+class ReadAhead:
+    """Async iterator that consumes a stream ahead of its reader
 
-    async with stream_writer(response) as write:
-        async for chunk in stream:
-            await write(chunk)
+    A background task reads from the stream into a queue bounded by `max_items`
+    items and `max_bytes` bytes, so the stream produces the next chunks while the
+    previous ones are being consumed.
+    """
+
+    __slots__ = (
+        "_stream",
+        "max_items",
+        "max_bytes",
+        "_items",
+        "_size",
+        "_changed",
+        "_task",
+    )
+
+    def __init__(
+        self,
+        stream: AsyncIterable[Buffer | str],
+        max_items: int,
+        max_bytes: int = 1024 * 1024,
+    ):
+        self._stream = stream
+        self.max_items = max(max_items, 1)
+        self.max_bytes = max_bytes
+        self._items: deque[Buffer | str] = deque()
+        self._size = 0
+        self._changed = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def _is_full(self) -> bool:
+        return len(self._items) >= self.max_items or (
+            self._items and self._size >= self.max_bytes
+        )
+
+    async def _produce(self):
+        try:
+            async for chunk in self._stream:
+                while self._is_full():
+                    self._changed.clear()
+                    await self._changed.wait()
+
+                self._items.append(chunk)
+                self._size += len(chunk)
+                self._changed.set()
+        finally:
+            self._changed.set()
+
+    def __aiter__(self) -> "ReadAhead":
+        return self
+
+    async def __anext__(self) -> Buffer | str:
+        if self._task is None:
+            self._task = asyncio.create_task(self._produce())
+
+        while not self._items:
+            if self._task.done():
+                if error := self._task.exception():
+                    raise error
+                raise StopAsyncIteration()
+
+            self._changed.clear()
+            await self._changed.wait()
+
+        chunk = self._items.popleft()
+        self._size -= len(chunk)
+        self._changed.set()
+        return chunk
+
+    async def aclose(self):
+        """Stop reading ahead and close the stream"""
+
+        if self._task and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+        if isinstance(self._stream, (AsyncGenerator, ThreadedIterator)):
+            await self._stream.aclose()
+
+
+async def respond_stream(
+    response: Response,
+    stream: AsyncIterable[Buffer | str] | Iterable[Buffer | str],
+    *,
+    buffer_size: int = 0,
+    flush_interval: float = None,
+    read_ahead: int = 0,
+    read_ahead_bytes: int = 1024 * 1024,
+    thread_batch_size: int = 64,
+):
+    """Respond with the given stream of data
+
+    `buffer_size` and `flush_interval` are passed to `stream_writer`.
+
+    If `read_ahead` is greater than 0, the stream is consumed by a background task
+    up to `read_ahead` chunks or `read_ahead_bytes` bytes ahead of what was sent,
+    so producing the stream and sending it to the client happen concurrently.
+
+    Synchronous iterables are consumed on a worker thread, up to `thread_batch_size`
+    chunks at a time, using `ThreadedIterator`. The thread comes from the default
+    executor (`asyncio.to_thread`) and is held for the whole response, so many
+    slow clients can use up the default thread pool.
+    """
 
+    if isinstance(stream, (bytes, bytearray, memoryview, str)):
+        raise TypeError("stream must be an iterable of chunks")
 
-def __file_last_modified(stat: os.stat_result) -> str:
-    return formatdate(stat.st_mtime, usegmt=True)
+    if not isinstance(stream, AsyncIterable):
+        stream = ThreadedIterator(stream, thread_batch_size)
 
+    if read_ahead > 0:
+        stream = ReadAhead(stream, read_ahead, read_ahead_bytes)
 
-def __guess_mimetype(path: str | PathLike[str]) -> str | None:
-    m_type, _ = mimetypes.guess_type(path, strict=False)
-    return m_type
+    async with stream_writer(
+        response, buffer_size=buffer_size, flush_interval=flush_interval
+    ) as write:
+        try:
+            async for chunk in stream:
+                await write(chunk)
+        finally:
+            if isinstance(stream, (AsyncGenerator, ReadAhead, ThreadedIterator)):
+                await stream.aclose()
 
 
 def __supports_pathsend(scope):
@@ -383,25 +808,170 @@ def __supports_zerocopysend(scope):
     return "extensions" in scope and "http.response.zerocopysend" in scope["extensions"]
 
 
-async def respond_file(response: Response, path: str | PathLike[str]):
-    """Send the given file to the response"""
+def __accepts_gzip(scope) -> bool:
+    for name, value in scope.get("headers", ()):
+        if name == b"accept-encoding":
+            for encoding in value.split(b","):
+                coding, _, params = encoding.strip().partition(b";")
+                if coding.strip() == b"gzip":
+                    return params.replace(b" ", b"") not in (b"q=0", b"q=0.0")
+    return False
+
+
+def __open_mmap(path: str | PathLike[str]) -> mmap.mmap:
+    with open(path, "rb") as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+async def __respond_file_mmap(
+    response: Response, path: str | PathLike[str], offset: int, count: int
+):
+    # the mapping is not closed explicitly because the server may still hold
+    # slices of it, it is unmapped once the last slice is released
+    view = memoryview(await _exec(__open_mmap, path))
+    chunk_size = AsyncFile.CHUNK_SIZE
+    end = min(offset + count, len(view))
+
+    async with stream_writer(response) as write:
+        for start in range(offset, end, chunk_size):
+            await write(view[start : min(start + chunk_size, end)])
+
+
+async def __respond_file_zerocopy(
+    response: Response,
+    path: str | PathLike[str],
+    metadata: FileMetadata,
+    offset: int,
+    count: int,
+):
+    file = await FILE_DESCRIPTOR_CACHE.acquire(path, metadata)
+    try:
+        await response.start()
+        await response._send(
+            {
+                "type": "http.response.zerocopysend",
+                "file": file,
+                "offset": offset,
+                "count": count,
+            }
+        )
+    finally:
+        FILE_DESCRIPTOR_CACHE.release(file)
+
+
+async def __iterate(content: Iterable | AsyncIterable) -> AsyncIterable:
+    if isinstance(content, AsyncIterable):
+        async for item in content:
+            yield item
+    else:
+        for item in content:
+            yield item
+
+
+async def respond_json_stream(
+    response: Response,
+    content: Iterable[Any] | AsyncIterable[Any],
+    *,
+    mode: JsonStreamMode = JsonStreamMode.ARRAY,
+    batch_size: int = 100,
+    codec: JsonCodec | str = None,
+):
+    """Respond with the items of the given iterable serialized as JSON
+
+    Items are encoded and written in batches of `batch_size`, so the whole
+    content is never held in memory.
+
+    :param response: The response to write to
+    :param content: Iterable or async iterable of items to serialize
+    :param mode: Write the items as a JSON array or as newline delimited JSON
+    :param batch_size: Number of items encoded before writing to the response
+    :param codec: Codec, or name of the codec, to use instead of the default one
+    """
+
+    if mode == JsonStreamMode.ARRAY:
+        response.content_type = "application/json"
+        prefix, separator, suffix = b"[", b",", b"]"
+    else:
+        response.content_type = "application/x-ndjson"
+        prefix, separator, suffix = b"", b"\n", b"\n"
+
+    encode = get_json_codec(codec).encode
+    batch: list[bytes] = []
+
+    async with stream_writer(response) as write:
+        async for item in __iterate(content):
+            batch.append(encode(item))
+
+            if len(batch) >= batch_size:
+                await write(prefix + separator.join(batch))
+                prefix = separator
+                batch.clear()
+
+        if batch:
+            await write(prefix + separator.join(batch) + suffix)
+        elif mode == JsonStreamMode.ARRAY:
+            await write(b"[]" if prefix == b"[" else suffix)
+        elif prefix:
+            await write(suffix)
+
+
+# pylint: disable = too-many-branches
+async def respond_file(
+    response: Response,
+    path: str | PathLike[str],
+    *,
+    offset: int = 0,
+    count: int = None,
+):
+    """Send the given file to the response
+
+    File metadata is served from `FILE_METADATA_CACHE`. When the server does not
+    support sending files by itself, small files are served from `FILE_CONTENT_CACHE`
+    and larger files are streamed in blocks of `AsyncFile.CHUNK_SIZE` bytes, either read
+    in a worker thread or sliced from a memory map if `ASGIKIT_RESPOND_FILE_MMAP` is set
+
+    :param response: The response to write to
+    :param path: Path of the file to send
+    :param offset: Position of the file to start sending from
+    :param count: Number of bytes to send, defaults to the rest of the file, and is
+    limited to the rest of the file.
+    If `offset` or `count` are given, the response is sent as partial content (HTTP 206)
+    :raise ValueError: If `offset` is not within the file or `count` is not positive
+    """
+
+    if count is not None and count <= 0:
+        raise ValueError("count")
+
+    metadata = await FILE_METADATA_CACHE.get(path)
+
+    # a partial response must include at least one byte
+    if not (offset == 0 or 0 < offset < metadata.size):
+        raise ValueError("offset")
+
+    is_partial = offset > 0 or count is not None
+    remaining = metadata.size - offset
+    count = remaining if count is None else min(count, remaining)
 
     if not response.content_type:
-        response.content_type = __guess_mimetype(path)
+        response.content_type = metadata.mimetype
 
-    stat = None
     if not response.content_length:
-        stat = await aiofiles.os.stat(path)
-        content_length = stat.st_size
-        response.content_length = content_length
+        response.content_length = count
 
     if "last-modified" not in response.headers:
-        if not stat:
-            stat = await aiofiles.os.stat(path)
-        last_modified = __file_last_modified(stat)
-        response.headers.set("last-modified", last_modified)
+        response.headers.set("last-modified", metadata.last_modified)
+
+    if "etag" not in response.headers:
+        response.headers.set("etag", metadata.etag)
 
-    if __supports_pathsend(response._scope):
+    if is_partial:
+        if response.status == HTTPStatus.OK:
+            response.status = HTTPStatus.PARTIAL_CONTENT
+        response.headers.set(
+            "content-range", f"bytes {offset}-{offset + count - 1}/{metadata.size}"
+        )
+
+    if not is_partial and __supports_pathsend(response._scope):
         await response.start()
         await response._send(
             {
@@ -412,18 +982,31 @@ async def respond_file(response: Response, path: str | PathLike[str]):
         return
 
     if __supports_zerocopysend(response._scope):
+        await __respond_file_zerocopy(response, path, metadata, offset, count)
+        return
+
+    if cached := await FILE_CONTENT_CACHE.get(path, metadata):
+        body = cached.content
+        if is_partial:
+            body = body[offset : offset + count]
+        elif cached.gzip_content:
+            response.headers.add("vary", "accept-encoding")
+            if __accepts_gzip(response._scope):
+                body = cached.gzip_content
+                response.header("content-encoding", "gzip")
+                response.content_length = len(body)
+                if response.headers.get("etag") == metadata.etag:
+                    # the gzip variant is a different representation of the file
+                    response.headers.set("etag", f'{metadata.etag[:-1]}-gzip"')
+
         await response.start()
-        file = await asyncio.to_thread(open, path, "rb")
-        await response._send(
-            {
-                "type": "http.response.zerocopysend",
-                "file": file.fileno(),
-            }
-        )
+        await response.write(body, more_body=False)
         return
 
-    async with aiofiles.open(path, "rb") as stream:
-        try:
-            await respond_stream(response, stream)
-        except ClientDisconnectError:
-            pass
+    try:
+        if RESPOND_FILE_MMAP and count > 0:
+            await __respond_file_mmap(response, path, offset, count)
+        else:
+            await respond_stream(response, AsyncFile(path).stream_range(offset, count))
+    except ClientDisconnectError:
+        pass
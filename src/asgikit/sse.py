@@ -0,0 +1,261 @@
+import asyncio
+import itertools
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator
+from enum import StrEnum
+
+from asgikit.errors.http import ClientDisconnectError
+from asgikit.responses import Response, stream_writer
+
+__all__ = (
+    "SlowSubscriberPolicy",
+    "SSEChannel",
+    "SSESubscription",
+    "encode_event",
+    "respond_sse",
+)
+
+HEARTBEAT = b":\n\n"
+
+
+# pylint: disable = redefined-builtin
+def _has_line_break(value: str) -> bool:
+    return "\n" in value or "\r" in value
+
+
+def encode_event(
+    data: str = None, *, event: str = None, id: str = None, retry: int = None
+) -> bytes:
+    """Encode a server-sent event in the `text/event-stream` format
+
+    Each line of `data` is sent in its own `data` field, so line breaks are kept
+
+    :raise ValueError: If `id` or `event` contain line breaks, or `id` contains NULL
+    """
+
+    lines = []
+
+    if id is not None:
+        if _has_line_break(id) or "\0" in id:
+            raise ValueError("id")
+        lines.append(f"id: {id}")
+
+    if event is not None:
+        if _has_line_break(event):
+            raise ValueError("event")
+        lines.append(f"event: {event}")
+
+    if retry is not None:
+        lines.append(f"retry: {retry}")
+
+    if data is not None:
+        data = data.replace("\r\n", "\n").replace("\r", "\n")
+        lines.extend(f"data: {line}" for line in data.split("\n"))
+
+    return ("\n".join(lines) + "\n\n").encode("utf-8")
+
+
+class SlowSubscriberPolicy(StrEnum):
+    """What to do when a subscriber falls too far behind
+
+    DROP: close the subscription, the client can reconnect and resume from
+    `Last-Event-ID`
+    CONFLATE: discard the oldest pending events
+    """
+
+    DROP = "drop"
+    CONFLATE = "conflate"
+
+
+class SSESubscription:
+    """Async iterator over the events published to an `SSEChannel`
+
+    Each iteration returns all pending events as a single chunk of bytes
+    """
+
+    __slots__ = ("_channel", "_pending", "_ready", "closed")
+
+    def __init__(self, channel: "SSEChannel", pending: list[bytes]):
+        self._channel = channel
+        self._pending: deque[bytes] = deque(pending)
+        self._ready = asyncio.Event()
+        self.closed = False
+
+        if pending:
+            self._ready.set()
+
+    def _push(self, data: bytes):
+        if len(self._pending) >= self._channel.queue_size:
+            if self._channel.policy == SlowSubscriberPolicy.DROP:
+                self.close()
+                return
+            self._pending.popleft()
+
+        self._pending.append(data)
+        self._ready.set()
+
+    def close(self):
+        """Stop receiving events"""
+
+        self.closed = True
+        self._ready.set()
+        self._channel._subscribers.discard(self)
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self
+
+    async def __anext__(self) -> bytes:
+        while not self._pending:
+            if self.closed:
+                raise StopAsyncIteration()
+            self._ready.clear()
+            await self._ready.wait()
+
+        if self.closed:
+            raise StopAsyncIteration()
+
+        data = b"".join(self._pending)
+        self._pending.clear()
+        return data
+
+
+class SSEChannel:
+    """Fan out server-sent events to many subscribers
+
+    Each event is encoded once and the encoded bytes are shared by all subscribers.
+    The last `history_size` events are kept so that reconnecting clients can resume
+    from the `Last-Event-ID` they have seen.
+
+    :param history_size: Number of events kept for replay
+    :param queue_size: Number of pending events a subscriber can hold
+    :param policy: What to do when a subscriber has `queue_size` pending events
+    """
+
+    __slots__ = (
+        "history_size",
+        "queue_size",
+        "policy",
+        "_history",
+        "_subscribers",
+        "_ids",
+    )
+
+    def __init__(
+        self,
+        history_size: int = 100,
+        queue_size: int = 100,
+        policy: SlowSubscriberPolicy = SlowSubscriberPolicy.DROP,
+    ):
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self.policy = policy
+        self._history: deque[tuple[str, bytes]] = deque(maxlen=history_size)
+        self._subscribers: set[SSESubscription] = set()
+        self._ids = itertools.count(1)
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, data: str = None, *, event: str = None, id: str = None) -> bytes:
+        """Publish an event to all subscribers
+
+        If no `id` is given, a sequential one is assigned
+        """
+
+        if id is None:
+            id = str(next(self._ids))
+
+        encoded = encode_event(data, event=event, id=id)
+        self._history.append((id, encoded))
+
+        for subscriber in list(self._subscribers):
+            subscriber._push(encoded)
+
+        return encoded
+
+    def subscribe(self, last_event_id: str = None) -> SSESubscription:
+        """Subscribe to the events of the channel
+
+        If `last_event_id` is found in the history, the events after it are replayed
+        """
+
+        pending = []
+        if last_event_id is not None:
+            for index, (event_id, _) in enumerate(self._history):
+                if event_id == last_event_id:
+                    pending = [
+                        data
+                        for _, data in itertools.islice(self._history, index + 1, None)
+                    ]
+                    break
+
+        subscription = SSESubscription(self, pending)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def close(self):
+        """Close all subscriptions"""
+
+        for subscriber in list(self._subscribers):
+            subscriber.close()
+
+
+def __last_event_id(scope) -> str | None:
+    for name, value in scope.get("headers", ()):
+        if name == b"last-event-id":
+            return value.decode("utf-8")
+    return None
+
+
+async def respond_sse(
+    response: Response,
+    source: SSEChannel | AsyncIterable[bytes | str],
+    *,
+    heartbeat_interval: float = 15.0,
+):
+    """Respond with a stream of server-sent events
+
+    When `source` is an `SSEChannel`, the response subscribes to it, resuming from
+    the `Last-Event-ID` header of the request. Otherwise, `source` must yield events
+    already encoded with `encode_event`, or strings to be sent as event data.
+
+    A comment is sent whenever no event is sent for `heartbeat_interval` seconds.
+    The response finishes when the source is exhausted or the client disconnects.
+    """
+
+    if isinstance(source, SSEChannel):
+        source = source.subscribe(__last_event_id(response._scope))
+
+    response.content_type = "text/event-stream"
+    response.header("cache-control", "no-cache")
+
+    iterator = aiter(source)
+    next_event = None
+
+    try:
+        async with stream_writer(response) as write:
+            while True:
+                if next_event is None:
+                    next_event = asyncio.ensure_future(anext(iterator))
+
+                done, _ = await asyncio.wait({next_event}, timeout=heartbeat_interval)
+                if not done:
+                    await write(HEARTBEAT)
+                    continue
+
+                try:
+                    data = next_event.result()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    next_event = None
+
+                await write(encode_event(data) if isinstance(data, str) else data)
+    except ClientDisconnectError:
+        pass
+    finally:
+        if next_event is not None:
+            next_event.cancel()
+        if isinstance(source, SSESubscription):
+            source.close()
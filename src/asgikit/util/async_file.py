@@ -1,16 +1,51 @@
 import asyncio
 import os
 from collections.abc import AsyncIterable
-from io import BytesIO
+from io import BufferedReader
 from pathlib import Path
 
-__all__ = ("AsyncFile",)
+from asgikit.util.buffers import Buffer
+from asgikit.util.executor import run_blocking
 
-DEFAULT_ASYNC_FILE_CHUNK_SIZE = "4096"
+__all__ = ("AsyncFile", "BufferPool")
+
+DEFAULT_ASYNC_FILE_CHUNK_SIZE = str(64 * 1024)
 
 
 async def _exec(func, /, *args, **kwargs):
-    return await asyncio.to_thread(func, *args, **kwargs)
+    return await run_blocking(func, *args, **kwargs)
+
+
+class BufferPool:
+    """Reusable buffers of `size` bytes, keeping at most `max_buffers` released ones"""
+
+    __slots__ = ("size", "max_buffers", "_free")
+
+    def __init__(self, size: int, max_buffers: int = 16):
+        self.size = size
+        self.max_buffers = max_buffers
+        self._free: list[bytearray] = []
+
+    def acquire(self) -> bytearray:
+        return self._free.pop() if self._free else bytearray(self.size)
+
+    def release(self, buffer: bytearray):
+        if len(self._free) < self.max_buffers:
+            self._free.append(buffer)
+
+
+_BUFFER_POOLS: dict[int, BufferPool] = {}
+
+
+def _buffer_pool(size: int) -> BufferPool:
+    if (pool := _BUFFER_POOLS.get(size)) is None:
+        pool = _BUFFER_POOLS[size] = BufferPool(size)
+    return pool
+
+
+def _read_into(file, buffer: bytearray, size: int) -> int:
+    with memoryview(buffer) as view:
+        return file.readinto(view[:size]) or 0
 
 
 class AsyncFile:
@@ -18,32 +53,97 @@ class AsyncFile:
         os.getenv("ASGIKIT_ASYNC_FILE_CHUNK_SIZE", DEFAULT_ASYNC_FILE_CHUNK_SIZE)
     )
 
-    __slots__ = ("path", "file")
+    __slots__ = ("path", "chunk_size", "file")
 
-    def __init__(self, path: str | Path):
+    def __init__(self, path: str | Path, chunk_size: int = None):
         self.path = path
-        self.file: BytesIO | None = None
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.file: BufferedReader | None = None
 
     async def _open(self):
         self.file = await _exec(open, self.path, "rb")
 
-    async def _read(self) -> bytes:
-        return await _exec(self.file.read, self.CHUNK_SIZE)
-
     async def _close(self):
         await _exec(self.file.close)
 
     async def stat(self) -> os.stat_result:
         return await _exec(os.stat, self.path)
 
-    async def stream(self) -> AsyncIterable[bytes]:
+    async def stream(self, *, reuse_buffers: bool = False) -> AsyncIterable[Buffer]:
+        """Stream the file in chunks of `chunk_size` bytes
+
+        See `stream_range`
+        """
+
+        async for chunk in self.stream_range(0, None, reuse_buffers=reuse_buffers):
+            yield chunk
+
+    async def stream_range(
+        self, offset: int, length: int | None, *, reuse_buffers: bool = False
+    ) -> AsyncIterable[Buffer]:
+        """Stream `length` bytes of the file starting at `offset`
+
+        The next chunk is read while the current one is being consumed. Chunks are
+        `bytes`, unless `reuse_buffers` is true, then chunks are `memoryview` slices of
+        two buffers taken from a pool, so each chunk is only valid until the next one
+        is requested.
+        """
+
+        pool = _buffer_pool(self.chunk_size) if reuse_buffers else None
+        buffers = [pool.acquire(), pool.acquire()] if pool else None
+        remaining = length
+        pending: tuple[bytearray | None, asyncio.Future] | None = None
+
+        def read_next(index: int) -> tuple[bytearray | None, asyncio.Future] | None:
+            size = (
+                self.chunk_size
+                if remaining is None
+                else min(self.chunk_size, remaining)
+            )
+            if size <= 0:
+                return None
+            if buffers is None:
+                return None, asyncio.ensure_future(_exec(self.file.read, size))
+            buffer = buffers[index]
+            return buffer, asyncio.ensure_future(
+                _exec(_read_into, self.file, buffer, size)
+            )
+
         try:
             await self._open()
-            while data := await self._read():
-                yield data
+            if offset:
+                await _exec(self.file.seek, offset)
+
+            index = 0
+            pending = read_next(index)
+            while pending is not None:
+                buffer, read = pending
+                pending = None
+                if not (result := await read):
+                    break
+
+                if buffer is None:
+                    chunk, count = result, len(result)
+                else:
+                    chunk, count = memoryview(buffer)[:result], result
+
+                if remaining is not None:
+                    remaining -= count
+
+                index ^= 1
+                pending = read_next(index)
+
+                yield chunk
         finally:
-            await _exec(self.file.close)
-            self.file = None
+            if pending is not None:
+                # the file cannot be closed nor the buffer reused while being read
+                await asyncio.wait([pending[1]])
+            if self.file is not None:
+                await _exec(self.file.close)
+                self.file = None
+            if buffers:
+                for buffer in buffers:
+                    pool.release(buffer)
 
     def __del__(self):
         if self.file and not self.file.closed:
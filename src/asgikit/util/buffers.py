@@ -0,0 +1,39 @@
+import os
+from typing import Any
+
+__all__ = ("Buffer", "to_buffer")
+
+DEFAULT_ZERO_COPY_BUFFERS = "false"
+
+ZERO_COPY_BUFFERS = os.getenv(
+    "ASGIKIT_ZERO_COPY_BUFFERS", DEFAULT_ZERO_COPY_BUFFERS
+).lower() in ("1", "true", "yes")
+
+Buffer = bytes | bytearray | memoryview
+
+
+def to_buffer(data: Any, encoding: str = "utf-8") -> Buffer:
+    """Return `data` as a bytes-like object to be sent to the server
+
+    `str` is encoded with the given encoding. Any other object supporting the buffer
+    protocol (e.g. `bytearray`, `memoryview`, `mmap`) is copied to `bytes`, as the
+    ASGI specification requires, unless `ZERO_COPY_BUFFERS` is enabled, then it is
+    returned as is, or as a byte oriented `memoryview`, for servers that accept them
+
+    :raise TypeError: If data is not `str` and does not support the buffer protocol
+    """
+
+    if isinstance(data, bytes):
+        return data
+
+    if isinstance(data, str):
+        return data.encode(encoding)
+
+    if not ZERO_COPY_BUFFERS:
+        return memoryview(data).tobytes()
+
+    if isinstance(data, bytearray):
+        return data
+
+    view = memoryview(data)
+    return view if view.format == "B" else view.cast("B")
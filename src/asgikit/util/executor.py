@@ -0,0 +1,185 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+__all__ = (
+    "ExecutorQueueFullError",
+    "ExecutorStats",
+    "BlockingExecutor",
+    "get_executor",
+    "set_executor",
+    "run_blocking",
+)
+
+T = TypeVar("T")
+
+DEFAULT_EXECUTOR_THREADS = str(min(32, (os.cpu_count() or 1) + 4))
+DEFAULT_EXECUTOR_QUEUE_SIZE = "1024"
+DEFAULT_EXECUTOR_NAME = "asgikit"
+
+
+class ExecutorQueueFullError(RuntimeError):
+    pass
+
+
+class ExecutorStats:
+    """Counters and timings of the tasks run by a `BlockingExecutor`
+
+    Times are in seconds
+    """
+
+    __slots__ = (
+        "submitted",
+        "completed",
+        "rejected",
+        "cancelled",
+        "active",
+        "queue_wait_total",
+        "queue_wait_max",
+        "run_time_total",
+        "run_time_max",
+    )
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.active = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.run_time_total = 0.0
+        self.run_time_max = 0.0
+
+    @property
+    def queued(self) -> int:
+        """Number of tasks waiting for a worker thread"""
+        return self.submitted - self.completed - self.cancelled - self.active
+
+
+class BlockingExecutor:
+    """Thread pool for blocking operations, such as file I/O
+
+    At most `queue_size` tasks can wait for one of the `max_workers` threads,
+    further tasks are rejected with `ExecutorQueueFullError`. A `queue_size` of `0`
+    does not limit the queue.
+    """
+
+    __slots__ = ("name", "max_workers", "queue_size", "stats", "_pool", "_lock")
+
+    def __init__(
+        self,
+        max_workers: int = None,
+        queue_size: int = None,
+        name: str = None,
+    ):
+        self.name = name or DEFAULT_EXECUTOR_NAME
+        self.max_workers = max_workers or int(DEFAULT_EXECUTOR_THREADS)
+        self.queue_size = (
+            queue_size if queue_size is not None else int(DEFAULT_EXECUTOR_QUEUE_SIZE)
+        )
+        self.stats = ExecutorStats()
+        self._pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix=self.name)
+        self._lock = threading.Lock()
+
+    def _done(self, future: Future):
+        # a task cancelled while waiting for a worker thread never reaches `_call`
+        if future.cancelled():
+            with self._lock:
+                self.stats.cancelled += 1
+
+    def _call(self, submitted_at: float, func: Callable, /, *args, **kwargs):
+        stats = self.stats
+        started_at = time.perf_counter()
+        wait = started_at - submitted_at
+
+        with self._lock:
+            stats.active += 1
+            stats.queue_wait_total += wait
+            stats.queue_wait_max = max(stats.queue_wait_max, wait)
+
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = time.perf_counter() - started_at
+            with self._lock:
+                stats.active -= 1
+                stats.completed += 1
+                stats.run_time_total += duration
+                stats.run_time_max = max(stats.run_time_max, duration)
+
+    async def run(self, func: Callable[..., T], /, *args, **kwargs) -> T:
+        """Run `func` in a worker thread
+
+        :raise ExecutorQueueFullError: If `queue_size` tasks are waiting
+        """
+
+        stats = self.stats
+        if self.queue_size and stats.queued >= self.queue_size:
+            stats.rejected += 1
+            raise ExecutorQueueFullError(f"executor '{self.name}' queue is full")
+
+        with self._lock:
+            stats.submitted += 1
+
+        call = functools.partial(
+            contextvars.copy_context().run,
+            self._call,
+            time.perf_counter(),
+            func,
+            *args,
+            **kwargs,
+        )
+        future = self._pool.submit(call)
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait)
+
+
+_EXECUTOR: BlockingExecutor | None = None
+
+
+def get_executor() -> BlockingExecutor:
+    """Return the executor used for blocking operations
+
+    It is created on first use, configured by the environment variables
+    `ASGIKIT_EXECUTOR_THREADS`, `ASGIKIT_EXECUTOR_QUEUE_SIZE` and
+    `ASGIKIT_EXECUTOR_NAME`
+    """
+
+    # pylint: disable = global-statement
+    global _EXECUTOR
+
+    if _EXECUTOR is None:
+        _EXECUTOR = BlockingExecutor(
+            int(os.getenv("ASGIKIT_EXECUTOR_THREADS", DEFAULT_EXECUTOR_THREADS)),
+            int(os.getenv("ASGIKIT_EXECUTOR_QUEUE_SIZE", DEFAULT_EXECUTOR_QUEUE_SIZE)),
+            os.getenv("ASGIKIT_EXECUTOR_NAME", DEFAULT_EXECUTOR_NAME),
+        )
+
+    return _EXECUTOR
+
+
+def set_executor(executor: BlockingExecutor):
+    """Set the executor used for blocking operations
+
+    Meant to be called once, when the application starts
+    """
+
+    # pylint: disable = global-statement
+    global _EXECUTOR
+    _EXECUTOR = executor
+
+
+async def run_blocking(func: Callable[..., Any], /, *args, **kwargs) -> Any:
+    """Run `func` in a worker thread of the executor used for blocking operations"""
+
+    return await get_executor().run(func, *args, **kwargs)
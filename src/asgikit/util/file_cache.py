@@ -0,0 +1,409 @@
+import gzip
+import mimetypes
+import os
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from io import FileIO
+from os import PathLike
+from typing import NamedTuple
+
+from asgikit.util.async_file import _exec
+
+__all__ = (
+    "FileMetadata",
+    "FileMetadataCache",
+    "FILE_METADATA_CACHE",
+    "CachedContent",
+    "FileContentCache",
+    "FILE_CONTENT_CACHE",
+    "FileDescriptorCache",
+    "FILE_DESCRIPTOR_CACHE",
+)
+
+DEFAULT_FILE_METADATA_CACHE_SIZE = "1024"
+DEFAULT_FILE_METADATA_CACHE_TTL = "1.0"
+
+DEFAULT_FILE_CONTENT_CACHE_SIZE = str(8 * 1024 * 1024)
+DEFAULT_FILE_CONTENT_CACHE_MAX_FILE_SIZE = str(64 * 1024)
+DEFAULT_FILE_CONTENT_CACHE_GZIP = "false"
+
+DEFAULT_FILE_DESCRIPTOR_CACHE_SIZE = "64"
+
+
+class FileMetadata(NamedTuple):
+    """Metadata of a file needed to respond with it"""
+
+    size: int
+    mtime_ns: int
+    mimetype: str | None
+    last_modified: str
+    etag: str
+
+    @classmethod
+    def from_stat(
+        cls, path: str | PathLike[str], stat: os.stat_result
+    ) -> "FileMetadata":
+        mimetype, _ = mimetypes.guess_type(path, strict=False)
+        return cls(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            mimetype=mimetype,
+            last_modified=formatdate(stat.st_mtime, usegmt=True),
+            etag=f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+        )
+
+
+class FileMetadataCache:
+    """Bounded LRU cache of file metadata keyed by path
+
+    Cached entries are trusted for `ttl` seconds without touching the filesystem.
+    After that, the next lookup stats the file again and rebuilds the entry
+    if the file has changed.
+    """
+
+    MAX_ENTRIES = int(
+        os.getenv("ASGIKIT_FILE_METADATA_CACHE_SIZE", DEFAULT_FILE_METADATA_CACHE_SIZE)
+    )
+
+    TTL = float(
+        os.getenv("ASGIKIT_FILE_METADATA_CACHE_TTL", DEFAULT_FILE_METADATA_CACHE_TTL)
+    )
+
+    __slots__ = ("max_entries", "ttl", "_entries")
+
+    def __init__(self, max_entries: int = None, ttl: float = None):
+        self.max_entries = max_entries if max_entries is not None else self.MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else self.TTL
+        self._entries: OrderedDict[str, tuple[FileMetadata, float]] = OrderedDict()
+
+    def lookup(self, path: str | PathLike[str]) -> FileMetadata | None:
+        """Return the cached metadata for the path if it is still fresh
+
+        Never touches the filesystem
+        """
+
+        key = os.fspath(path)
+        if (entry := self._entries.get(key)) is None:
+            return None
+
+        metadata, checked_at = entry
+        if time.monotonic() - checked_at > self.ttl:
+            return None
+
+        self._entries.move_to_end(key)
+        return metadata
+
+    async def get(self, path: str | PathLike[str]) -> FileMetadata:
+        """Return the metadata for the path, from the cache if it is still fresh
+
+        :raise FileNotFoundError: If the file does not exist
+        """
+
+        if metadata := self.lookup(path):
+            return metadata
+
+        key = os.fspath(path)
+        stat = await _exec(os.stat, key)
+
+        entry = self._entries.get(key)
+        if (
+            entry
+            and entry[0].mtime_ns == stat.st_mtime_ns
+            and entry[0].size == stat.st_size
+        ):
+            metadata = entry[0]
+        else:
+            metadata = FileMetadata.from_stat(key, stat)
+
+        self._store(key, metadata)
+        return metadata
+
+    def _store(self, key: str, metadata: FileMetadata):
+        if self.max_entries <= 0:
+            return
+
+        self._entries[key] = (metadata, time.monotonic())
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, path: str | PathLike[str] = None):
+        """Remove the entry for the given path, or all entries if no path is given"""
+
+        if path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(os.fspath(path), None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+FILE_METADATA_CACHE = FileMetadataCache()
+
+
+class CachedContent(NamedTuple):
+    """Contents of a file, and optionally its gzip variant, for a given etag"""
+
+    etag: str
+    content: bytes
+    gzip_content: bytes | None
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + len(self.gzip_content or b"")
+
+
+def _read_file(path: str, compress: bool) -> tuple[bytes, bytes | None]:
+    with open(path, "rb") as file:
+        content = file.read()
+
+    gzip_content = None
+    if compress:
+        compressed = gzip.compress(content, mtime=0)
+        if len(compressed) < len(content):
+            gzip_content = compressed
+
+    return content, gzip_content
+
+
+class FileContentCache:
+    """Byte budgeted LRU cache of the contents of small files
+
+    Entries are validated against the etag of the file metadata, so a changed
+    file is read again once `FileMetadataCache` notices the change.
+    Files larger than `max_file_size` are never cached.
+    """
+
+    MAX_SIZE = int(
+        os.getenv("ASGIKIT_FILE_CONTENT_CACHE_SIZE", DEFAULT_FILE_CONTENT_CACHE_SIZE)
+    )
+
+    MAX_FILE_SIZE = int(
+        os.getenv(
+            "ASGIKIT_FILE_CONTENT_CACHE_MAX_FILE_SIZE",
+            DEFAULT_FILE_CONTENT_CACHE_MAX_FILE_SIZE,
+        )
+    )
+
+    GZIP = os.getenv(
+        "ASGIKIT_FILE_CONTENT_CACHE_GZIP", DEFAULT_FILE_CONTENT_CACHE_GZIP
+    ).lower() in ("1", "true", "yes")
+
+    __slots__ = (
+        "max_size",
+        "max_file_size",
+        "gzip",
+        "hits",
+        "misses",
+        "evictions",
+        "_entries",
+        "_size",
+    )
+
+    def __init__(
+        self, max_size: int = None, max_file_size: int = None, gzip: bool = None
+    ):
+        self.max_size = max_size if max_size is not None else self.MAX_SIZE
+        self.max_file_size = (
+            max_file_size if max_file_size is not None else self.MAX_FILE_SIZE
+        )
+        self.gzip = gzip if gzip is not None else self.GZIP
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: OrderedDict[str, CachedContent] = OrderedDict()
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        """Total number of bytes held by the cache"""
+        return self._size
+
+    def is_cacheable(self, metadata: FileMetadata) -> bool:
+        return 0 < self.max_file_size and metadata.size <= min(
+            self.max_file_size, self.max_size
+        )
+
+    def lookup(
+        self, path: str | PathLike[str], metadata: FileMetadata
+    ) -> CachedContent | None:
+        """Return the cached contents of the file if they match the metadata
+
+        Never touches the filesystem
+        """
+
+        key = os.fspath(path)
+        entry = self._entries.get(key)
+
+        if entry is None or entry.etag != metadata.etag:
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    async def get(
+        self, path: str | PathLike[str], metadata: FileMetadata
+    ) -> CachedContent | None:
+        """Return the contents of the file, reading and caching them on a miss
+
+        Returns None if the file is not cacheable
+        """
+
+        if not self.is_cacheable(metadata):
+            return None
+
+        if entry := self.lookup(path, metadata):
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+
+        key = os.fspath(path)
+        content, gzip_content = await _exec(_read_file, key, self.gzip)
+
+        entry = CachedContent(metadata.etag, content, gzip_content)
+        self._store(key, entry)
+        return entry
+
+    def _store(self, key: str, entry: CachedContent):
+        self.invalidate(key)
+
+        if entry.size > self.max_size:
+            return
+
+        self._entries[key] = entry
+        self._size += entry.size
+
+        while self._size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+            self.evictions += 1
+
+    def invalidate(self, path: str | PathLike[str] = None):
+        """Remove the entry for the given path, or all entries if no path is given"""
+
+        if path is None:
+            self._entries.clear()
+            self._size = 0
+        elif entry := self._entries.pop(os.fspath(path), None):
+            self._size -= entry.size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+FILE_CONTENT_CACHE = FileContentCache()
+
+
+class _CachedFile:
+    __slots__ = ("key", "etag", "file", "refs")
+
+    def __init__(self, key: str, etag: str, file: FileIO):
+        self.key = key
+        self.etag = etag
+        self.file = file
+        self.refs = 0
+
+
+class FileDescriptorCache:
+    """Reference counted cache of open files
+
+    Files are shared between concurrent users, so they must only be read at
+    explicit offsets (e.g. `os.sendfile` or `os.pread`). Files without users are
+    kept open up to `max_idle` entries and are closed as soon as they become
+    stale or are evicted.
+    """
+
+    MAX_IDLE = int(
+        os.getenv(
+            "ASGIKIT_FILE_DESCRIPTOR_CACHE_SIZE", DEFAULT_FILE_DESCRIPTOR_CACHE_SIZE
+        )
+    )
+
+    __slots__ = ("max_idle", "_entries", "_files", "_idle")
+
+    def __init__(self, max_idle: int = None):
+        self.max_idle = max_idle if max_idle is not None else self.MAX_IDLE
+        self._entries: dict[str, _CachedFile] = {}
+        self._files: dict[int, _CachedFile] = {}
+        self._idle: OrderedDict[int, _CachedFile] = OrderedDict()
+
+    async def acquire(
+        self, path: str | PathLike[str], metadata: FileMetadata
+    ) -> FileIO:
+        """Return an open file for the path matching the given metadata
+
+        Every call must be paired with a call to `release`
+        """
+
+        key = os.fspath(path)
+
+        if not (entry := self._current(key, metadata)):
+            file = await _exec(FileIO, key, "rb")
+
+            # another task may have opened the same file in the meantime
+            if entry := self._current(key, metadata):
+                file.close()
+            else:
+                self._detach(key)
+                entry = _CachedFile(key, metadata.etag, file)
+                self._entries[key] = entry
+                self._files[id(file)] = entry
+
+        entry.refs += 1
+        self._idle.pop(id(entry.file), None)
+        return entry.file
+
+    def release(self, file: FileIO):
+        """Give back a file returned by `acquire`"""
+
+        entry = self._files[id(file)]
+        entry.refs -= 1
+
+        if entry.refs > 0:
+            return
+
+        if self._entries.get(entry.key) is not entry:
+            self._close(entry)
+            return
+
+        self._idle[id(file)] = entry
+        while len(self._idle) > self.max_idle:
+            _, evicted = self._idle.popitem(last=False)
+            del self._entries[evicted.key]
+            self._close(evicted)
+
+    def clear(self):
+        """Close all files without users and forget the ones still in use
+
+        Files still in use are closed when they are released
+        """
+
+        for entry in list(self._entries.values()):
+            self._detach(entry.key)
+
+    def _current(self, key: str, metadata: FileMetadata) -> _CachedFile | None:
+        entry = self._entries.get(key)
+        if entry and entry.etag == metadata.etag:
+            return entry
+        return None
+
+    def _detach(self, key: str):
+        if (entry := self._entries.pop(key, None)) and entry.refs == 0:
+            self._idle.pop(id(entry.file), None)
+            self._close(entry)
+
+    def _close(self, entry: _CachedFile):
+        del self._files[id(entry.file)]
+        entry.file.close()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+
+FILE_DESCRIPTOR_CACHE = FileDescriptorCache()
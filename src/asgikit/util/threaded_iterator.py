@@ -0,0 +1,155 @@
+import asyncio
+import threading
+import time
+from collections.abc import AsyncIterator, Iterable
+from concurrent.futures import Future
+from typing import Generic, TypeVar
+
+__all__ = ("ThreadedIterator",)
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class _Error:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class ThreadedIterator(Generic[T]):
+    """Async iterator over a blocking iterable
+
+    The iterable is consumed on a worker thread in batches of `batch_size` items,
+    which are put in a queue of at most `max_batches` batches. The worker thread
+    is blocked while the queue is full.
+
+    A partial batch is put as soon as the consumer is waiting for items, or once
+    `max_delay` seconds have passed since its first item, so slow iterables are
+    not held back until a full batch is read.
+
+    Once the iterable is exhausted, raises an error or the iterator is closed, further
+    calls raise `StopAsyncIteration`.
+    """
+
+    __slots__ = (
+        "_iterable",
+        "batch_size",
+        "max_batches",
+        "max_delay",
+        "_queue",
+        "_loop",
+        "_task",
+        "_batch",
+        "_stopped",
+        "_pending_put",
+        "_finished",
+        "_waiting",
+    )
+
+    def __init__(
+        self,
+        iterable: Iterable[T],
+        batch_size: int = 64,
+        max_batches: int = 4,
+        max_delay: float = 0.05,
+    ):
+        self._iterable = iterable
+        self.batch_size = max(batch_size, 1)
+        self.max_batches = max(max_batches, 1)
+        self.max_delay = max_delay
+        self._queue: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._batch: list[T] = []
+        self._stopped = threading.Event()
+        self._pending_put: Future | None = None
+        self._finished = False
+        self._waiting = False
+
+    def _put(self, item):
+        self._pending_put = asyncio.run_coroutine_threadsafe(
+            self._queue.put(item), self._loop
+        )
+        if self._stopped.is_set():
+            # closed before the put could be seen by `aclose`
+            self._pending_put.cancel()
+        self._pending_put.result()
+        self._pending_put = None
+
+    def _drain(self):
+        iterator = iter(self._iterable)
+        try:
+            batch = []
+            started = 0.0
+            for item in iterator:
+                if self._stopped.is_set():
+                    return
+                if not batch:
+                    started = time.monotonic()
+                batch.append(item)
+                if (
+                    len(batch) >= self.batch_size
+                    or self._waiting
+                    or time.monotonic() - started >= self.max_delay
+                ):
+                    self._put(batch)
+                    batch = []
+            if batch:
+                self._put(batch)
+            self._put(_DONE)
+        except BaseException as error:
+            if not self._stopped.is_set():
+                self._put(_Error(error))
+        finally:
+            if close := getattr(iterator, "close", None):
+                close()
+
+    def __aiter__(self) -> AsyncIterator[T]:
+        return self
+
+    async def __anext__(self) -> T:
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._queue = asyncio.Queue(self.max_batches)
+            # the worker thread is held until the iterable is exhausted, so it does not
+            # use the bounded executor for blocking operations
+            self._task = asyncio.create_task(asyncio.to_thread(self._drain))
+
+        if not self._batch:
+            if self._finished:
+                raise StopAsyncIteration()
+
+            # read by the worker thread to put a partial batch
+            self._waiting = self._queue.empty()
+            try:
+                batch = await self._queue.get()
+            finally:
+                self._waiting = False
+            if batch is _DONE:
+                self._finished = True
+                raise StopAsyncIteration()
+            if isinstance(batch, _Error):
+                self._finished = True
+                raise batch.error
+            batch.reverse()
+            self._batch = batch
+
+        return self._batch.pop()
+
+    async def aclose(self):
+        """Stop consuming the iterable
+
+        The worker thread stops before reading the next item
+        """
+
+        self._finished = True
+        self._batch = []
+        self._stopped.set()
+        if pending_put := self._pending_put:
+            pending_put.cancel()
+        if self._queue is not None:
+            while not self._queue.empty():
+                self._queue.get_nowait()
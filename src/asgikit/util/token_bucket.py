@@ -0,0 +1,45 @@
+import time
+
+__all__ = ("TokenBucket",)
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens per second, holding at most `capacity`
+
+    Tokens can be taken beyond the available amount, and the debt is paid before
+    more tokens become available
+    """
+
+    __slots__ = ("rate", "capacity", "_tokens", "_updated")
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self._tokens + (now - self._updated) * self.rate, self.capacity
+        )
+        self._updated = now
+
+    def delay(self, amount: float) -> float:
+        """Return how many seconds until `amount` tokens are available"""
+
+        self._refill()
+        if self._tokens >= min(amount, self.capacity):
+            return 0.0
+        return (min(amount, self.capacity) - self._tokens) / self.rate
+
+    def take(self, amount: float):
+        """Take `amount` tokens, even if not available"""
+
+        self._refill()
+        self._tokens -= amount
@@ -1,14 +1,222 @@
+import asyncio
+import os
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Hashable
 from enum import StrEnum
+from typing import Any
 
+from asgikit._json import JsonCodec, get_json_codec
 from asgikit.asgi import AsgiReceive, AsgiScope, AsgiSend
 from asgikit.errors.websocket import (
     WebSocketDisconnectError,
     WebSocketError,
+    WebSocketLimitError,
+    WebSocketQueueFullError,
     WebSocketStateError,
+    WebSocketTimeoutError,
 )
 from asgikit.headers import MutableHeaders
+from asgikit.util.buffers import Buffer, to_buffer
+from asgikit.util.token_bucket import TokenBucket
 
-__all__ = ("WebSocket",)
+__all__ = (
+    "WebSocket",
+    "WebSocketStats",
+    "WEBSOCKET_STATS",
+    "RateLimitAction",
+    "OutboundQueue",
+    "ConflatingSender",
+)
+
+DEFAULT_WEBSOCKET_RECEIVE_TIMEOUT = "0"
+DEFAULT_WEBSOCKET_IDLE_TIMEOUT = "0"
+DEFAULT_WEBSOCKET_MAX_MESSAGE_SIZE = "0"
+
+# "going away", sent when a connection is closed for being inactive
+TIMEOUT_CLOSE_CODE = 1001
+# "policy violation", sent when a connection exceeds its rate limits
+RATE_LIMIT_CLOSE_CODE = 1008
+# "message too big"
+MESSAGE_TOO_BIG_CLOSE_CODE = 1009
+
+
+class WebSocketStats:
+    """Process wide counters of connections closed for being inactive and of
+    messages exceeding the limits of their connection
+    """
+
+    __slots__ = (
+        "receive_timeouts",
+        "idle_timeouts",
+        "keepalive_timeouts",
+        "delayed",
+        "dropped",
+        "limit_closes",
+    )
+
+    def __init__(self):
+        self.receive_timeouts = 0
+        self.idle_timeouts = 0
+        self.keepalive_timeouts = 0
+        self.delayed = 0
+        self.dropped = 0
+        self.limit_closes = 0
+
+    @property
+    def reclaimed(self) -> int:
+        return self.receive_timeouts + self.idle_timeouts + self.keepalive_timeouts
+
+
+WEBSOCKET_STATS = WebSocketStats()
+
+
+class RateLimitAction(StrEnum):
+    """What to do with a message exceeding the limits of its connection
+
+    DELAY: wait until the rate limits allow the message, oversized messages close
+    the connection
+    DROP: discard the message
+    CLOSE: close the connection with 1008, or 1009 for oversized messages
+    """
+
+    DELAY = "delay"
+    DROP = "drop"
+    CLOSE = "close"
+
+
+class _Limits:
+    __slots__ = ("messages", "bytes", "max_message_size", "action")
+
+    def __init__(
+        self,
+        messages_per_second: float = None,
+        bytes_per_second: float = None,
+        max_message_size: int = None,
+        action: RateLimitAction = RateLimitAction.DELAY,
+        burst: float = 1.0,
+    ):
+        self.messages = (
+            TokenBucket(messages_per_second, messages_per_second * burst)
+            if messages_per_second
+            else None
+        )
+        self.bytes = (
+            TokenBucket(bytes_per_second, bytes_per_second * burst)
+            if bytes_per_second
+            else None
+        )
+        self.max_message_size = max_message_size or None
+        self.action = action
+
+
+def _message_size(data: str | bytes) -> int:
+    if isinstance(data, str) and not data.isascii():
+        return len(data.encode("utf-8"))
+    return len(data)
+
+
+class _KeepAlive:
+    __slots__ = ("interval", "timeout", "ping", "pong", "alive", "task")
+
+    def __init__(
+        self, interval: float, timeout: float, ping: Buffer | str, pong: Buffer | str
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self.ping = ping
+        self.pong = pong
+        self.alive = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+
+class OutboundQueue:
+    """Bounded queue of messages sent to a WebSocket connection by a writer task
+
+    The writer task sends up to `batch_size` pending messages each time it wakes up.
+    Once the queue holds `high_water_mark` messages, `WebSocket.send` waits until it
+    goes down to `low_water_mark`, while `WebSocket.send_nowait` fails only when the
+    queue holds `max_size` messages.
+    """
+
+    __slots__ = (
+        "max_size",
+        "high_water_mark",
+        "low_water_mark",
+        "batch_size",
+        "_messages",
+        "_in_flight",
+        "_ready",
+        "_writable",
+        "_idle",
+        "_task",
+    )
+
+    def __init__(
+        self,
+        max_size: int = 256,
+        high_water_mark: int = None,
+        low_water_mark: int = None,
+        batch_size: int = 32,
+    ):
+        self.max_size = max(max_size, 1)
+        self.high_water_mark = min(high_water_mark or self.max_size, self.max_size)
+        self.low_water_mark = min(
+            low_water_mark if low_water_mark is not None else self.high_water_mark // 2,
+            self.high_water_mark - 1,
+        )
+        self.batch_size = max(batch_size, 1)
+
+        self._messages: deque[dict] = deque()
+        self._in_flight = 0
+        self._ready = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def depth(self) -> int:
+        """Number of messages waiting to be sent"""
+        return len(self._messages) + self._in_flight
+
+    @property
+    def writable(self) -> bool:
+        """Tell if the queue is below the high water mark"""
+        return self._writable.is_set()
+
+    def _put(self, message: dict):
+        self._messages.append(message)
+        if self.depth >= self.high_water_mark:
+            self._writable.clear()
+        self._idle.clear()
+        self._ready.set()
+
+    def _take(self) -> list[dict]:
+        messages = self._messages
+        batch = [messages.popleft() for _ in range(min(self.batch_size, len(messages)))]
+        self._in_flight = len(batch)
+        return batch
+
+    def _sent(self):
+        self._in_flight -= 1
+        if self.depth <= self.low_water_mark:
+            self._writable.set()
+
+    def _clear(self):
+        self._messages.clear()
+        self._in_flight = 0
+        self._writable.set()
+        self._idle.set()
+
+    async def wait_writable(self):
+        """Wait until the queue goes down to the low water mark"""
+        await self._writable.wait()
+
+    async def join(self):
+        """Wait until all queued messages are sent"""
+        await self._idle.wait()
 
 
 class WebSocket:
@@ -21,19 +229,59 @@ class WebSocket:
         ACCEPTED = "ACCEPTED"
         CLOSED = "CLOSED"
 
-    __slots__ = ("_scope", "_receive", "_send", "__state")
+    RECEIVE_TIMEOUT = float(
+        os.getenv(
+            "ASGIKIT_WEBSOCKET_RECEIVE_TIMEOUT", DEFAULT_WEBSOCKET_RECEIVE_TIMEOUT
+        )
+    )
+
+    IDLE_TIMEOUT = float(
+        os.getenv("ASGIKIT_WEBSOCKET_IDLE_TIMEOUT", DEFAULT_WEBSOCKET_IDLE_TIMEOUT)
+    )
+
+    MAX_MESSAGE_SIZE = int(
+        os.getenv(
+            "ASGIKIT_WEBSOCKET_MAX_MESSAGE_SIZE", DEFAULT_WEBSOCKET_MAX_MESSAGE_SIZE
+        )
+    )
+
+    __slots__ = (
+        "_scope",
+        "_receive",
+        "_send",
+        "receive_timeout",
+        "idle_timeout",
+        "__state",
+        "__outbound",
+        "__keepalive",
+        "__limits",
+    )
 
     def __init__(self, scope: AsgiScope, receive: AsgiReceive, send: AsgiSend):
         self._scope = scope
         self._receive = receive
         self._send = send
+        self.receive_timeout: float | None = self.RECEIVE_TIMEOUT or None
+        self.idle_timeout: float | None = self.IDLE_TIMEOUT or None
         self.__state = self.State.NEW
+        self.__outbound: OutboundQueue | None = None
+        self.__keepalive: _KeepAlive | None = None
+        self.__limits: _Limits | None = (
+            _Limits(max_message_size=self.MAX_MESSAGE_SIZE)
+            if self.MAX_MESSAGE_SIZE
+            else None
+        )
 
     @property
     def state(self) -> State:
         """Return the current state of the WebSocket connection"""
         return self.__state
 
+    @property
+    def outbound(self) -> OutboundQueue | None:
+        """Return the outbound queue, if enabled"""
+        return self.__outbound
+
     @property
     def subprotocols(self) -> list[str]:
         """Return a list of subprotocols of this WebSocket connection"""
@@ -75,56 +323,417 @@ class WebSocket:
 
         self.__state = self.State.ACCEPTED
 
-    async def receive(self) -> str | bytes:
+    def set_limits(
+        self,
+        *,
+        messages_per_second: float = None,
+        bytes_per_second: float = None,
+        max_message_size: int = None,
+        action: RateLimitAction = RateLimitAction.DELAY,
+        burst: float = 1.0,
+    ):
+        """Limit the rate and size of the messages returned by `receive`
+
+        Rates are enforced with token buckets holding `burst` seconds worth of tokens.
+        `action` tells what to do with messages exceeding the limits.
+        `max_message_size` defaults to `MAX_MESSAGE_SIZE`, `0` removes the limit
+        """
+
+        if max_message_size is None:
+            max_message_size = self.MAX_MESSAGE_SIZE
+
+        self.__limits = _Limits(
+            messages_per_second, bytes_per_second, max_message_size, action, burst
+        )
+
+    async def __check_limits(self, data: str | bytes) -> bool:
+        limits = self.__limits
+        size = _message_size(data)
+
+        if limits.max_message_size and size > limits.max_message_size:
+            if limits.action == RateLimitAction.DROP:
+                WEBSOCKET_STATS.dropped += 1
+                return False
+            await self.__close_for_limit(MESSAGE_TOO_BIG_CLOSE_CODE, "message too big")
+
+        delay = max(
+            limits.messages.delay(1) if limits.messages else 0.0,
+            limits.bytes.delay(size) if limits.bytes else 0.0,
+        )
+
+        if delay > 0:
+            match limits.action:
+                case RateLimitAction.DROP:
+                    WEBSOCKET_STATS.dropped += 1
+                    return False
+                case RateLimitAction.CLOSE:
+                    await self.__close_for_limit(
+                        RATE_LIMIT_CLOSE_CODE, "rate limit exceeded"
+                    )
+                case RateLimitAction.DELAY:
+                    WEBSOCKET_STATS.delayed += 1
+                    await asyncio.sleep(delay)
+
+        if limits.messages:
+            limits.messages.take(1)
+        if limits.bytes:
+            limits.bytes.take(size)
+
+        return True
+
+    async def __close_for_limit(self, code: int, reason: str):
+        WEBSOCKET_STATS.limit_closes += 1
+        await self.__close_now(code, reason)
+        raise WebSocketLimitError(code, reason)
+
+    def enable_keepalive(
+        self,
+        interval: float = 20.0,
+        timeout: float = 20.0,
+        ping: Buffer | str = "ping",
+        pong: Buffer | str = "pong",
+    ):
+        """Send `ping` every `interval` seconds and close the connection if nothing is
+        received within `timeout` seconds
+
+        Messages equal to `pong` are not returned by `receive`
+
+        :raise WebSocketStateError: If the WebSocket state is not ACCEPTED
+        """
+
+        if self.state != self.State.ACCEPTED:
+            raise WebSocketStateError()
+
+        if self.__keepalive is None:
+            self.__keepalive = _KeepAlive(interval, timeout, ping, pong)
+            self.__keepalive.task = asyncio.create_task(self.__run_keepalive())
+
+    async def __run_keepalive(self):
+        keepalive = self.__keepalive
+        try:
+            while self.state == self.State.ACCEPTED:
+                await asyncio.sleep(keepalive.interval)
+
+                keepalive.alive.clear()
+                await self.send(keepalive.ping)
+
+                try:
+                    await asyncio.wait_for(keepalive.alive.wait(), keepalive.timeout)
+                except asyncio.TimeoutError:
+                    WEBSOCKET_STATS.keepalive_timeouts += 1
+                    await self.__close_now(TIMEOUT_CLOSE_CODE, "keepalive timeout")
+                    return
+        except WebSocketError:
+            pass
+
+    def __stop_keepalive(self):
+        if self.__keepalive is not None:
+            if (task := self.__keepalive.task) is not asyncio.current_task():
+                task.cancel()
+
+    def enable_outbound(
+        self,
+        max_size: int = 256,
+        high_water_mark: int = None,
+        low_water_mark: int = None,
+        batch_size: int = 32,
+    ) -> OutboundQueue:
+        """Send messages through a bounded queue drained by a writer task
+
+        :raise WebSocketStateError: If the WebSocket state is not ACCEPTED
+        """
+
+        if self.state != self.State.ACCEPTED:
+            raise WebSocketStateError()
+
+        if self.__outbound is None:
+            self.__outbound = OutboundQueue(
+                max_size, high_water_mark, low_water_mark, batch_size
+            )
+            self.__outbound._task = asyncio.create_task(self.__write_outbound())
+
+        return self.__outbound
+
+    async def __write_outbound(self):
+        outbound = self.__outbound
+        try:
+            while True:
+                await outbound._ready.wait()
+                outbound._ready.clear()
+
+                while outbound._messages:
+                    for message in outbound._take():
+                        if self.state != self.State.ACCEPTED:
+                            outbound._clear()
+                            return
+                        await self._send(message)
+                        outbound._sent()
+
+                outbound._idle.set()
+        except Exception:  # pylint: disable = broad-exception-caught
+            # the connection is gone, further sends fail with WebSocketStateError
+            self.__state = self.State.CLOSED
+            outbound._clear()
+
+    def __stop_outbound(self):
+        if self.__outbound is not None:
+            self.__outbound._clear()
+            if (task := self.__outbound._task) is not asyncio.current_task():
+                task.cancel()
+
+    def __receive_wait(self, deadline: float | None) -> tuple[float | None, str]:
+        wait = None
+        if deadline is not None:
+            wait = max(deadline - time.monotonic(), 0)
+
+        if self.idle_timeout and (wait is None or self.idle_timeout < wait):
+            return self.idle_timeout, "idle timeout"
+
+        return wait, "receive timeout"
+
+    async def receive(self, timeout: float = None) -> str | bytes:
         """Receive data from the WebSocket connection
 
+        If no data is received within `timeout` seconds (by default `receive_timeout`),
+        or no message, including keepalive pongs, arrives for `idle_timeout` seconds
+        while waiting, the connection is closed with code 1001 and
+        `WebSocketTimeoutError` is raised
+
         :raise WebSocketStateError: If the WebSocket state is not ACCEPTED
         :raise WebSocketDisconnectError: if the client disconnect
+        :raise WebSocketTimeoutError: if the connection is closed by a timeout
+        :raise WebSocketLimitError: if the connection is closed for exceeding its limits
         """
 
         if self.state != self.State.ACCEPTED:
             raise WebSocketStateError()
 
-        message = await self._receive()
-        if message["type"] == "websocket.disconnect":
+        timeout = timeout if timeout is not None else self.receive_timeout
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        while True:
+            # the idle clock starts when the wait begins, so a message that arrived
+            # while the application was busy is not mistaken for an idle connection
+            wait, reason = self.__receive_wait(deadline)
+
+            if wait is None:
+                message = await self._receive()
+            else:
+                try:
+                    message = await asyncio.wait_for(self._receive(), wait)
+                except asyncio.TimeoutError:
+                    await self.__timeout(reason)
+
+            if message["type"] == "websocket.disconnect":
+                self.__state = self.State.CLOSED
+                self.__stop_outbound()
+                self.__stop_keepalive()
+                raise WebSocketDisconnectError(message["code"])
+
+            if (data := message.get("text")) is None:
+                data = message.get("bytes")
+
+            if (keepalive := self.__keepalive) is not None:
+                keepalive.alive.set()
+                if data == keepalive.pong:
+                    continue
+
+            if self.__limits is not None and not await self.__check_limits(data):
+                continue
+
+            return data
+
+    async def __timeout(self, reason: str):
+        if reason == "idle timeout":
+            WEBSOCKET_STATS.idle_timeouts += 1
+        else:
+            WEBSOCKET_STATS.receive_timeouts += 1
+
+        await self.__close_now(TIMEOUT_CLOSE_CODE, reason)
+        raise WebSocketTimeoutError(TIMEOUT_CLOSE_CODE, reason)
+
+    async def __close_now(self, code: int, reason: str):
+        self.__stop_outbound()
+        self.__stop_keepalive()
+        if self.state != self.State.ACCEPTED:
+            return
+        try:
+            await self.__send_close(code, reason)
+        except Exception:  # pylint: disable = broad-exception-caught
             self.__state = self.State.CLOSED
-            raise WebSocketDisconnectError(message["code"])
 
-        return message.get("text") or message.get("bytes")
+    def __aiter__(self) -> AsyncIterator[str | bytes]:
+        return self
+
+    async def __anext__(self) -> str | bytes:
+        try:
+            return await self.receive()
+        except WebSocketDisconnectError:
+            raise StopAsyncIteration() from None
+
+    async def iter_text(self) -> AsyncIterator[str]:
+        """Iterate over the messages received until the client disconnects
+
+        Binary messages are decoded as utf-8
+        """
+
+        async for data in self:
+            yield data if isinstance(data, str) else str(data, "utf-8")
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        """Iterate over the messages received until the client disconnects
+
+        Text messages are encoded as utf-8
+        """
+
+        async for data in self:
+            yield data.encode("utf-8") if isinstance(data, str) else data
+
+    async def iter_json(self, *, codec: JsonCodec | str = None) -> AsyncIterator[Any]:
+        """Iterate over the messages received until the client disconnects,
+        decoded as json
+        """
+
+        decode = get_json_codec(codec).decode
+        async for data in self:
+            yield decode(data)
+
+    async def receive_json(
+        self, timeout: float = None, *, codec: JsonCodec | str = None
+    ):
+        """Receive a message decoded as json"""
+
+        return get_json_codec(codec).decode(await self.receive(timeout))
+
+    @staticmethod
+    def encode(data: Buffer | str) -> dict:
+        """Build the message to send data with `send_encoded`
+
+        The message can be sent to many connections
+
+        :raise TypeError: If data is not str and does not support the buffer protocol
+        """
+
+        if isinstance(data, str):
+            return {"type": "websocket.send", "text": data}
+
+        try:
+            return {"type": "websocket.send", "bytes": to_buffer(data)}
+        except TypeError as err:
+            raise TypeError("must be 'str' or support the buffer protocol") from err
+
+    @staticmethod
+    def encode_json(
+        content: Any, *, codec: JsonCodec | str = None, binary: bool = False
+    ) -> dict:
+        """Build the message to send content as json with `send_encoded`
+
+        The json is sent as a text message, unless `binary` is true
+        """
+
+        data = get_json_codec(codec).encode(content)
+        if binary:
+            return {"type": "websocket.send", "bytes": data}
+        return {"type": "websocket.send", "text": data.decode("utf-8")}
 
-    async def send(self, data: bytes | str):
+    async def send(self, data: Buffer | str):
         """Send data to the WebSocket connection
 
+        `str` is sent as a text message, any object supporting the buffer protocol
+        is sent as a binary message, copied to `bytes` unless `ZERO_COPY_BUFFERS` is
+        enabled
+
+        If the outbound queue is enabled, the data is queued, waiting while the queue
+        is above its high water mark
+
         :raise WebSocketStateError: If the WebSocket state is not ACCEPTED
-        :raise TypeError: If data is not bytes or str
+        :raise TypeError: If data is not str and does not support the buffer protocol
         """
 
         if self.state != self.State.ACCEPTED:
             raise WebSocketStateError()
 
-        if isinstance(data, bytes):
-            data_field = "bytes"
-        elif isinstance(data, str):
-            data_field = "text"
-        else:
-            raise TypeError("must be 'bytes' or 'str'")
+        await self.send_encoded(self.encode(data))
 
-        await self._send(
-            {
-                "type": "websocket.send",
-                data_field: data,
-            }
-        )
+    async def send_json(
+        self, content: Any, *, codec: JsonCodec | str = None, binary: bool = False
+    ):
+        """Send content encoded as json
+
+        :raise WebSocketStateError: If the WebSocket state is not ACCEPTED
+        """
 
-    async def close(self, code: int = 1000, reason: str = ""):
+        if self.state != self.State.ACCEPTED:
+            raise WebSocketStateError()
+
+        await self.send_encoded(self.encode_json(content, codec=codec, binary=binary))
+
+    async def send_encoded(self, message: dict):
+        """Send a message built by `encode` or `encode_json`
+
+        :raise WebSocketStateError: If the WebSocket state is not ACCEPTED
+        """
+
+        if self.state != self.State.ACCEPTED:
+            raise WebSocketStateError()
+
+        if (outbound := self.__outbound) is None:
+            await self._send(message)
+            return
+
+        # every waiter wakes when the queue is writable again, so the ones that find
+        # it above the high water mark go back to waiting
+        while True:
+            await outbound.wait_writable()
+            if self.state != self.State.ACCEPTED:
+                raise WebSocketStateError()
+            if outbound.writable:
+                break
+
+        outbound._put(message)
+
+    def send_nowait(self, data: Buffer | str):
+        """Queue data to be sent by the writer task of the outbound queue
+
+        :raise WebSocketStateError: If the WebSocket state is not ACCEPTED or the
+        outbound queue is not enabled
+        :raise WebSocketQueueFullError: If the outbound queue is full
+        :raise TypeError: If data is not str and does not support the buffer protocol
+        """
+
+        if self.state != self.State.ACCEPTED or self.__outbound is None:
+            raise WebSocketStateError()
+
+        if self.__outbound.depth >= self.__outbound.max_size:
+            raise WebSocketQueueFullError()
+
+        self.__outbound._put(self.encode(data))
+
+    async def close(self, code: int = 1000, reason: str = "", *, timeout: float = 5.0):
         """Close the WebSocket connection
 
+        Messages in the outbound queue are sent before closing, for at most `timeout`
+        seconds, then the messages not sent yet are discarded
+
         :raise WebSocketStateError: If the WebSocket state is not ACCEPTED
         """
 
         if self.state != self.State.ACCEPTED:
             raise WebSocketStateError()
 
+        if self.__outbound is not None:
+            try:
+                await asyncio.wait_for(self.__outbound.join(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self.__stop_outbound()
+            if self.state != self.State.ACCEPTED:
+                raise WebSocketStateError()
+
+        self.__stop_keepalive()
+        await self.__send_close(code, reason)
+
+    async def __send_close(self, code: int, reason: str):
         await self._send(
             {
                 "type": "websocket.close",
@@ -134,3 +743,96 @@ class WebSocket:
         )
 
         self.__state = self.State.CLOSED
+
+
+class ConflatingSender:
+    """Send only the latest value of each topic to a WebSocket connection
+
+    `update` replaces the value of the topic waiting to be sent. A writer task sends
+    the pending values as soon as the previous ones are sent, so updates are sent at
+    the pace of the client, or once every `interval` seconds, if given.
+    """
+
+    __slots__ = (
+        "websocket",
+        "interval",
+        "updates",
+        "conflated",
+        "_pending",
+        "_ready",
+        "_flushing",
+        "_task",
+    )
+
+    def __init__(self, websocket: WebSocket, interval: float = None):
+        self.websocket = websocket
+        self.interval = interval
+
+        self.updates = 0
+        self.conflated = 0
+
+        self._pending: dict[Hashable, Buffer | str] = {}
+        self._ready = asyncio.Event()
+        self._flushing = asyncio.Event()
+        self._task = asyncio.create_task(self._write())
+
+    @property
+    def pending(self) -> int:
+        """Number of topics waiting to be sent"""
+        return len(self._pending)
+
+    @property
+    def closed(self) -> bool:
+        return self._task.done()
+
+    def update(self, topic: Hashable, data: Buffer | str):
+        """Set the value to send for the topic, replacing the pending one
+
+        :raise WebSocketStateError: If the sender is closed
+        """
+
+        if self._task.done():
+            raise WebSocketStateError()
+
+        if topic in self._pending:
+            self.conflated += 1
+
+        self._pending[topic] = data
+        self.updates += 1
+        self._ready.set()
+
+    async def _write(self):
+        flushing = self._flushing
+        try:
+            while self._pending or not flushing.is_set():
+                await self._ready.wait()
+                self._ready.clear()
+
+                pending, self._pending = self._pending, {}
+                for data in pending.values():
+                    await self.websocket.send(data)
+
+                if self.interval and not flushing.is_set():
+                    try:
+                        # stops waiting if flushed
+                        await asyncio.wait_for(flushing.wait(), self.interval)
+                    except asyncio.TimeoutError:
+                        pass
+        except WebSocketError:
+            self._pending.clear()
+
+    async def flush(self):
+        """Send the pending values and stop sending updates
+
+        Waits for the writer task to finish sending the values it is sending
+        """
+
+        self._flushing.set()
+        self._ready.set()
+        await self._task
+
+    def close(self):
+        """Stop sending updates, discarding the pending values"""
+
+        self._task.cancel()
+        self._pending.clear()
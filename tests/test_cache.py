@@ -0,0 +1,263 @@
+import asyncio
+
+from asgikit.cache import RequestCoalescer, ResponseCache
+from asgikit.requests import Request
+from asgikit.responses import respond_text
+from tests.utils.asgi import HttpSendInspector
+
+
+def make_app(headers: dict[str, str] = None):
+    calls = []
+
+    async def app(scope, receive, send):
+        request = Request(scope, receive, send)
+        calls.append(request.path)
+        for name, value in (headers or {}).items():
+            request.response.header(name, value)
+        await respond_text(request.response, f"response {len(calls)}")
+
+    return app, calls
+
+
+def make_scope(path="/", method="GET", headers=None, query_string=b""):
+    return {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query_string,
+        "headers": headers or [],
+    }
+
+
+async def call(app, scope) -> HttpSendInspector:
+    inspector = HttpSendInspector()
+    await app(scope, None, inspector)
+    return inspector
+
+
+async def test_cache_hit_replays_response():
+    app, calls = make_app({"cache-control": "max-age=60"})
+    cache = ResponseCache(app)
+
+    first = await call(cache, make_scope())
+    second = await call(cache, make_scope())
+
+    assert first.body == second.body == "response 1"
+    assert second.headers["cache-control"] == "max-age=60"
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_cache_key_includes_query():
+    app, calls = make_app({"cache-control": "max-age=60"})
+    cache = ResponseCache(app)
+
+    await call(cache, make_scope(query_string=b"a=1"))
+    await call(cache, make_scope(query_string=b"a=2"))
+
+    assert len(calls) == 2
+
+
+async def test_cache_respects_vary():
+    app, calls = make_app({"cache-control": "max-age=60", "vary": "accept-language"})
+    cache = ResponseCache(app)
+
+    en = make_scope(headers=[(b"accept-language", b"en")])
+    pt = make_scope(headers=[(b"accept-language", b"pt")])
+
+    await call(cache, en)
+    await call(cache, pt)
+    await call(cache, en)
+
+    assert len(calls) == 2
+
+
+async def test_cache_does_not_store_no_store():
+    app, calls = make_app({"cache-control": "no-store, max-age=60"})
+    cache = ResponseCache(app)
+
+    await call(cache, make_scope())
+    await call(cache, make_scope())
+
+    assert len(calls) == 2
+    assert len(cache) == 0
+
+
+async def test_cache_entry_expires():
+    app, calls = make_app()
+    cache = ResponseCache(app, default_ttl=0.01)
+
+    await call(cache, make_scope())
+    await asyncio.sleep(0.02)
+    await call(cache, make_scope())
+
+    assert len(calls) == 2
+
+
+async def test_cache_evicts_by_size():
+    app, _ = make_app({"cache-control": "max-age=60"})
+    cache = ResponseCache(app, max_size=250)
+
+    for path in ("/a", "/b", "/c"):
+        await call(cache, make_scope(path))
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.size <= 250
+
+
+async def test_cache_ignores_post():
+    app, calls = make_app({"cache-control": "max-age=60"})
+    cache = ResponseCache(app)
+
+    await call(cache, make_scope(method="POST"))
+    await call(cache, make_scope(method="POST"))
+
+    assert len(calls) == 2
+
+
+async def test_cache_does_not_store_for_request_no_store():
+    app, calls = make_app({"cache-control": "max-age=60"})
+    cache = ResponseCache(app)
+
+    await call(cache, make_scope(headers=[(b"cache-control", b"no-store")]))
+    await call(cache, make_scope())
+
+    assert len(calls) == 2
+
+
+async def test_cache_does_not_store_authorized_responses():
+    app, calls = make_app({"cache-control": "max-age=60"})
+    cache = ResponseCache(app)
+
+    authorized = [(b"authorization", b"Bearer token")]
+    await call(cache, make_scope(headers=authorized))
+    await call(cache, make_scope(headers=authorized))
+
+    assert len(calls) == 2
+    assert len(cache) == 0
+
+
+async def test_cache_stores_public_authorized_responses():
+    app, calls = make_app({"cache-control": "public, max-age=60"})
+    cache = ResponseCache(app)
+
+    authorized = [(b"authorization", b"Bearer token")]
+    await call(cache, make_scope(headers=authorized))
+    await call(cache, make_scope(headers=authorized))
+
+    assert len(calls) == 1
+
+
+async def test_cache_skips_requests_with_cookies():
+    app, calls = make_app({"cache-control": "max-age=60"})
+    cache = ResponseCache(app)
+
+    with_cookie = [(b"cookie", b"session=1")]
+    await call(cache, make_scope(headers=with_cookie))
+    await call(cache, make_scope(headers=with_cookie))
+
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (0, 0)
+
+    cache = ResponseCache(app, cache_cookies=True)
+    await call(cache, make_scope(headers=with_cookie))
+    await call(cache, make_scope(headers=with_cookie))
+
+    assert len(calls) == 3
+
+
+def header_appending_send(send, value: bytes):
+    async def wrapper(message):
+        if message["type"] == "http.response.start":
+            message["headers"].append((b"x-request", value))
+        await send(message)
+
+    return wrapper
+
+
+async def test_cache_replay_is_not_changed_by_middleware():
+    app, _ = make_app({"cache-control": "max-age=60"})
+    cache = ResponseCache(app)
+
+    for value in (b"1", b"2", b"3"):
+        inspector = HttpSendInspector()
+        await cache(make_scope(), None, header_appending_send(inspector, value))
+        start = inspector.events["http.response.start"][0]
+        assert [v for k, v in start["headers"] if k == b"x-request"] == [value]
+
+    assert cache.hits == 2
+
+
+def make_slow_app(delay: float, headers: dict[str, str] = None):
+    calls = []
+
+    async def app(scope, receive, send):
+        request = Request(scope, receive, send)
+        calls.append(request.path)
+        await asyncio.sleep(delay)
+        for name, value in (headers or {}).items():
+            request.response.header(name, value)
+        await respond_text(request.response, f"response {len(calls)}")
+
+    return app, calls
+
+
+async def test_coalescer_runs_handler_once():
+    app, calls = make_slow_app(0.01)
+    coalescer = RequestCoalescer(app)
+
+    results = await asyncio.gather(*[call(coalescer, make_scope()) for _ in range(5)])
+
+    assert len(calls) == 1
+    assert all(result.body == "response 1" for result in results)
+    assert (coalescer.executions, coalescer.coalesced) == (1, 4)
+
+
+async def test_coalescer_replay_is_not_changed_by_middleware():
+    app, _ = make_slow_app(0.01)
+    coalescer = RequestCoalescer(app)
+
+    inspectors = [HttpSendInspector() for _ in range(3)]
+    await asyncio.gather(
+        *[
+            coalescer(make_scope(), None, header_appending_send(inspector, b"%d" % i))
+            for i, inspector in enumerate(inspectors)
+        ]
+    )
+
+    assert coalescer.coalesced == 2
+    for i, inspector in enumerate(inspectors):
+        start = inspector.events["http.response.start"][0]
+        assert [v for k, v in start["headers"] if k == b"x-request"] == [b"%d" % i]
+
+
+async def test_coalescer_separates_by_vary_headers():
+    app, calls = make_slow_app(0.01)
+    coalescer = RequestCoalescer(app)
+
+    await asyncio.gather(
+        call(coalescer, make_scope(headers=[(b"authorization", b"a")])),
+        call(coalescer, make_scope(headers=[(b"authorization", b"b")])),
+    )
+
+    assert len(calls) == 2
+
+
+async def test_coalescer_falls_back_after_timeout():
+    app, calls = make_slow_app(0.05)
+    coalescer = RequestCoalescer(app, timeout=0.01)
+
+    await asyncio.gather(call(coalescer, make_scope()), call(coalescer, make_scope()))
+
+    assert len(calls) == 2
+    assert coalescer.fallbacks == 1
+
+
+async def test_coalescer_does_not_share_cookies():
+    app, calls = make_slow_app(0.01, {"set-cookie": "session=1"})
+    coalescer = RequestCoalescer(app)
+
+    await asyncio.gather(call(coalescer, make_scope()), call(coalescer, make_scope()))
+
+    assert len(calls) == 2
@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+
+from asgikit.channels import (
+    OP_PUBLISH,
+    OP_SUBSCRIBE,
+    ChannelLayer,
+    ChannelLayerError,
+    FrameDecoder,
+    InMemoryChannelLayer,
+    UnixSocketBroker,
+    UnixSocketChannelLayer,
+    encode_frame,
+)
+from asgikit.sse import SSEChannel
+
+
+def test_frame_decoder_partial_frames():
+    data = encode_frame(OP_PUBLISH, "chat", "message") + encode_frame(
+        OP_PUBLISH, "chat", b"data"
+    )
+
+    decoder = FrameDecoder()
+    assert decoder.feed(data[:5]) == []
+
+    frames = decoder.feed(data[5:])
+    assert [frame for frame, _ in frames] == [
+        (OP_PUBLISH, 1, "chat", b"message"),
+        (OP_PUBLISH, 0, "chat", b"data"),
+    ]
+    assert b"".join(raw for _, raw in frames) == data
+
+
+async def test_in_memory_layer():
+    layer = InMemoryChannelLayer()
+    subscription = layer.subscribe("chat")
+    other = layer.subscribe("other")
+
+    await layer.publish("chat", "message")
+    assert await anext(subscription) == "message"
+    assert not other._pending
+
+    await layer.close()
+    assert subscription.closed
+
+
+async def test_relay_to_sse_channel():
+    layer = InMemoryChannelLayer()
+    channel = SSEChannel()
+    events = channel.subscribe()
+
+    task = asyncio.create_task(layer.relay("news", channel))
+    await asyncio.sleep(0)
+
+    await layer.publish("news", b"update")
+    assert await anext(events) == b"id: 1\ndata: update\n\n"
+
+    await layer.close()
+    await task
+
+
+async def test_unix_socket_layer_between_processes(tmp_path):
+    path = tmp_path / "broker.sock"
+    broker = UnixSocketBroker(path)
+    await broker.start()
+
+    first = UnixSocketChannelLayer(path)
+    second = UnixSocketChannelLayer(path)
+    await first.connect()
+    await second.connect()
+
+    local = first.subscribe("chat")
+    remote = second.subscribe("chat")
+    await asyncio.sleep(0.05)
+
+    for i in range(10):
+        await first.publish("chat", f"{i}")
+    await first.publish("chat", b"data")
+
+    received = [await anext(remote) for _ in range(11)]
+    assert received == [f"{i}" for i in range(10)] + [b"data"]
+
+    assert [await anext(local) for _ in range(11)] == received
+    assert not local._pending
+
+    # subscription and all messages of the same tick use a single write
+    assert first.flushes == 2
+
+    await first.close()
+    await second.close()
+    await broker.close()
+    assert not path.exists()
+
+
+async def test_unix_socket_layer_fails_when_broker_is_gone(tmp_path):
+    path = tmp_path / "broker.sock"
+    broker = UnixSocketBroker(path)
+    await broker.start()
+
+    layer = UnixSocketChannelLayer(path)
+    await layer.connect()
+    subscription = layer.subscribe("chat")
+    await layer.publish("chat", "message")
+    await asyncio.sleep(0.05)
+
+    await asyncio.wait_for(broker.close(), 1)
+    assert not broker._clients
+
+    assert await anext(subscription) == "message"
+    with pytest.raises(ChannelLayerError):
+        await asyncio.wait_for(anext(subscription), 1)
+
+    with pytest.raises(ChannelLayerError):
+        await layer.publish("chat", "message")
+
+    with pytest.raises(ChannelLayerError):
+        layer.subscribe("chat")
+
+    await layer.close()
+
+
+async def test_unix_socket_broker_drops_slow_clients(tmp_path):
+    path = tmp_path / "broker.sock"
+    broker = UnixSocketBroker(path, buffer_limit=1024)
+    await broker.start()
+
+    # subscribes and never reads
+    _, slow = await asyncio.open_unix_connection(path)
+    slow.write(encode_frame(OP_SUBSCRIBE, "chat"))
+    await slow.drain()
+
+    layer = UnixSocketChannelLayer(path)
+    await layer.connect()
+    await asyncio.sleep(0.05)
+
+    for _ in range(8):
+        await layer.publish("chat", bytes(1024 * 1024))
+        await asyncio.sleep(0.01)
+
+    assert broker.dropped == 1
+    assert "chat" not in broker._channels
+
+    slow.close()
+    await layer.close()
+    await broker.close()
+
+
+def test_channel_layer_publish_is_abstract():
+    with pytest.raises(TypeError):
+        ChannelLayer()  # pylint: disable = abstract-class-instantiated
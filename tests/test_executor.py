@@ -0,0 +1,100 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from asgikit.util import executor as executor_module
+from asgikit.util.async_file import AsyncFile
+from asgikit.util.executor import (
+    BlockingExecutor,
+    ExecutorQueueFullError,
+    get_executor,
+    set_executor,
+)
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = BlockingExecutor(max_workers=1, queue_size=1, name="test")
+    monkeypatch.setattr(executor_module, "_EXECUTOR", executor)
+    yield executor
+    executor.shutdown()
+
+
+async def test_executor_stats(executor):
+    def work():
+        time.sleep(0.01)
+        return threading.current_thread().name
+
+    name = await executor.run(work)
+
+    assert name.startswith("test")
+    assert executor.stats.submitted == 1
+    assert executor.stats.completed == 1
+    assert executor.stats.active == 0
+    assert executor.stats.run_time_max >= 0.01
+
+
+async def test_executor_rejects_when_queue_is_full(executor):
+    release = threading.Event()
+
+    running = asyncio.ensure_future(executor.run(release.wait))
+    await asyncio.sleep(0.01)
+    queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+    await asyncio.sleep(0)
+
+    assert executor.stats.active == 1
+    assert executor.stats.queued == 1
+
+    with pytest.raises(ExecutorQueueFullError):
+        await executor.run(lambda: None)
+
+    assert executor.stats.rejected == 1
+
+    release.set()
+    await running
+    assert await queued == "queued"
+    assert executor.stats.queue_wait_max > 0
+
+
+async def test_async_file_uses_executor(executor, tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"data")
+
+    assert b"".join([chunk async for chunk in AsyncFile(path).stream()]) == b"data"
+    assert executor.stats.completed >= 3
+
+
+def test_set_executor(monkeypatch):
+    monkeypatch.setattr(executor_module, "_EXECUTOR", None)
+
+    executor = BlockingExecutor(max_workers=2)
+    set_executor(executor)
+
+    assert get_executor() is executor
+    executor.shutdown()
+
+
+async def test_executor_cancelled_while_queued(executor):
+    release = threading.Event()
+
+    running = asyncio.ensure_future(executor.run(release.wait))
+    await asyncio.sleep(0.01)
+    queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+    await asyncio.sleep(0)
+
+    assert executor.stats.queued == 1
+
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+
+    assert executor.stats.cancelled == 1
+    assert executor.stats.queued == 0
+
+    release.set()
+    await running
+
+    assert executor.stats.queued == 0
+    assert executor.stats.completed == 1
@@ -0,0 +1,181 @@
+import gzip
+import os
+
+from pytest import fixture
+
+from asgikit.util import file_cache
+from asgikit.util.file_cache import (
+    FileContentCache,
+    FileDescriptorCache,
+    FileMetadataCache,
+)
+
+
+@fixture
+def tmp_file(tmp_path):
+    file = tmp_path / "test_file.txt"
+    file.write_text("test")
+    return file
+
+
+async def test_metadata(tmp_file):
+    cache = FileMetadataCache()
+    metadata = await cache.get(tmp_file)
+
+    stat = os.stat(tmp_file)
+    assert metadata.size == 4
+    assert metadata.mtime_ns == stat.st_mtime_ns
+    assert metadata.mimetype == "text/plain"
+    assert metadata.etag == f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    assert metadata.last_modified.endswith("GMT")
+
+
+async def test_metadata_cache_hit_does_not_stat(tmp_file, monkeypatch):
+    cache = FileMetadataCache(ttl=60)
+    metadata = await cache.get(tmp_file)
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("should not stat")
+
+    monkeypatch.setattr(file_cache, "_exec", fail)
+
+    assert cache.lookup(tmp_file) is metadata
+    assert await cache.get(str(tmp_file)) is metadata
+
+
+async def test_metadata_cache_revalidates_after_ttl(tmp_file):
+    cache = FileMetadataCache(ttl=0)
+    metadata = await cache.get(tmp_file)
+    assert cache.lookup(tmp_file) is None
+
+    tmp_file.write_text("changed")
+    os.utime(tmp_file, ns=(0, metadata.mtime_ns + 1_000_000_000))
+
+    new_metadata = await cache.get(tmp_file)
+    assert new_metadata.size == 7
+    assert new_metadata.etag != metadata.etag
+
+
+async def test_metadata_cache_is_bounded(tmp_path):
+    cache = FileMetadataCache(max_entries=2)
+
+    for name in ("a", "b", "c"):
+        file = tmp_path / name
+        file.write_text(name)
+        await cache.get(file)
+
+    assert len(cache) == 2
+    assert cache.lookup(tmp_path / "a") is None
+
+
+async def test_content_cache_hit_and_miss(tmp_file):
+    metadata = await FileMetadataCache().get(tmp_file)
+    cache = FileContentCache()
+
+    entry = await cache.get(tmp_file, metadata)
+    assert entry.content == b"test"
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    assert await cache.get(tmp_file, metadata) is entry
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_content_cache_revalidates_against_metadata(tmp_file):
+    metadata_cache = FileMetadataCache(ttl=0)
+    cache = FileContentCache()
+
+    metadata = await metadata_cache.get(tmp_file)
+    await cache.get(tmp_file, metadata)
+
+    tmp_file.write_text("changed")
+    os.utime(tmp_file, ns=(0, metadata.mtime_ns + 1_000_000_000))
+
+    metadata = await metadata_cache.get(tmp_file)
+    entry = await cache.get(tmp_file, metadata)
+    assert entry.content == b"changed"
+    assert cache.misses == 2
+
+
+async def test_content_cache_evicts_by_size(tmp_path):
+    metadata_cache = FileMetadataCache()
+    cache = FileContentCache(max_size=10)
+
+    for name in ("a", "b", "c"):
+        file = tmp_path / name
+        file.write_text(name * 4)
+        await cache.get(file, await metadata_cache.get(file))
+
+    assert len(cache) == 2
+    assert cache.size == 8
+    assert cache.evictions == 1
+
+
+async def test_content_cache_skips_large_files(tmp_file):
+    metadata = await FileMetadataCache().get(tmp_file)
+    cache = FileContentCache(max_file_size=2)
+
+    assert await cache.get(tmp_file, metadata) is None
+    assert len(cache) == 0
+
+
+async def test_content_cache_gzip(tmp_path):
+    file = tmp_path / "file.txt"
+    file.write_text("test" * 100)
+
+    metadata = await FileMetadataCache().get(file)
+    entry = await FileContentCache(gzip=True).get(file, metadata)
+    assert gzip.decompress(entry.gzip_content) == b"test" * 100
+
+
+async def test_descriptor_cache_reuses_files(tmp_file):
+    metadata = await FileMetadataCache().get(tmp_file)
+    cache = FileDescriptorCache(max_idle=1)
+
+    file1 = await cache.acquire(tmp_file, metadata)
+    file2 = await cache.acquire(tmp_file, metadata)
+    assert file1 is file2
+
+    cache.release(file1)
+    cache.release(file2)
+    assert not file1.closed
+
+    assert await cache.acquire(tmp_file, metadata) is file1
+    cache.release(file1)
+
+
+async def test_descriptor_cache_closes_stale_files(tmp_file):
+    metadata_cache = FileMetadataCache(ttl=0)
+    cache = FileDescriptorCache()
+
+    metadata = await metadata_cache.get(tmp_file)
+    old_file = await cache.acquire(tmp_file, metadata)
+
+    os.utime(tmp_file, ns=(0, metadata.mtime_ns + 1_000_000_000))
+    metadata = await metadata_cache.get(tmp_file)
+
+    new_file = await cache.acquire(tmp_file, metadata)
+    assert new_file is not old_file
+    assert not old_file.closed
+
+    cache.release(old_file)
+    assert old_file.closed
+
+    cache.release(new_file)
+    assert len(cache) == 1
+
+
+async def test_descriptor_cache_closes_evicted_files(tmp_path):
+    metadata_cache = FileMetadataCache()
+    cache = FileDescriptorCache(max_idle=1)
+
+    files = []
+    for name in ("a", "b"):
+        path = tmp_path / name
+        path.write_text(name)
+        file = await cache.acquire(path, await metadata_cache.get(path))
+        cache.release(file)
+        files.append(file)
+
+    assert files[0].closed
+    assert not files[1].closed
+    assert len(cache) == 1
@@ -1,3 +1,5 @@
+import asyncio
+
 from pytest import fixture
 
 from asgikit.util.async_file import AsyncFile
@@ -54,3 +56,34 @@ async def test_read_file_chunks(tmp_file, monkeypatch):
         data.append(chunk)
 
     assert data == [b"t", b"e", b"s", b"t"]
+    assert all(type(chunk) is bytes for chunk in data)
+
+
+async def test_read_file_range_reusing_buffers(tmp_path):
+    path = tmp_path / "test_file"
+    path.write_bytes(bytes(range(256)) * 4)
+
+    file = AsyncFile(path, chunk_size=100)
+
+    data = []
+    async for chunk in file.stream_range(10, 250, reuse_buffers=True):
+        data.append(bytes(chunk))
+
+    assert [len(chunk) for chunk in data] == [100, 100, 50]
+    assert b"".join(data) == (bytes(range(256)) * 4)[10:260]
+    assert file.file is None
+
+
+async def test_read_file_prefetches_next_chunk(tmp_path):
+    path = tmp_path / "test_file"
+    path.write_bytes(b"abcdef")
+
+    file = AsyncFile(path, chunk_size=2)
+    stream = file.stream()
+
+    assert await anext(stream) == b"ab"
+    # the next chunk was requested before the first was consumed
+    await asyncio.sleep(0.01)
+    assert file.file.tell() == 4
+
+    assert [bytes(chunk) async for chunk in stream] == [b"cd", b"ef"]
@@ -0,0 +1,143 @@
+import asyncio
+
+from asgikit.errors.websocket import WebSocketDisconnectError
+from asgikit.hub import Hub, SlowConsumerPolicy
+from tests.utils.asgi import (
+    BlockedSend,
+    WebSocketSendInspector,
+    accepted_websocket,
+)
+
+
+async def test_broadcast_to_all_connections():
+    hub = Hub()
+    clients = [await accepted_websocket() for _ in range(3)]
+    for websocket, _, _ in clients:
+        hub.add(websocket)
+
+    assert hub.broadcast("message", exclude=clients[0][0]) == 2
+    hub.broadcast(b"data")
+    await asyncio.sleep(0)
+
+    assert clients[0][2].text == []
+    assert clients[0][2].bytes == [b"data"]
+    for _, _, send in clients[1:]:
+        assert send.text == ["message"]
+        assert send.bytes == [b"data"]
+
+    # the message is encoded once and shared by all connections
+    first, second = (send.events["websocket.send"][-1] for _, _, send in clients[1:])
+    assert first is second
+
+    hub.close()
+
+
+async def test_broadcast_to_group():
+    hub = Hub()
+    (ws1, _, send1), (ws2, _, send2) = (
+        await accepted_websocket(),
+        await accepted_websocket(),
+    )
+    hub.add(ws1, "room")
+    hub.add(ws2)
+
+    assert ws1 in hub.group("room")
+    assert ws2 not in hub.group("room")
+    assert hub.groups(ws1) == {"room"}
+
+    hub.group("room").broadcast("message")
+    await asyncio.sleep(0)
+
+    assert send1.text == ["message"]
+    assert send2.text == []
+
+    hub.remove(ws1)
+    assert len(hub) == 1
+    assert len(hub.group("room")) == 0
+
+    hub.close()
+
+
+async def test_slow_consumer_does_not_block_others():
+    hub = Hub(queue_size=2, policy=SlowConsumerPolicy.DROP)
+    slow, _, slow_send = await accepted_websocket(BlockedSend())
+    fast, _, fast_send = await accepted_websocket()
+    hub.add(slow)
+    hub.add(fast)
+
+    for i in range(5):
+        hub.broadcast(f"{i}")
+        await asyncio.sleep(0)
+
+    assert fast_send.text == ["0", "1", "2", "3", "4"]
+    assert hub.pending(slow) == 2
+    assert hub.dropped == 2
+
+    slow_send.allowed.set()
+    await asyncio.sleep(0.01)
+    assert slow_send.text == ["0", "1", "2"]
+
+    hub.close()
+
+
+async def test_slow_consumer_conflate():
+    hub = Hub(queue_size=2, policy=SlowConsumerPolicy.CONFLATE)
+    slow, _, slow_send = await accepted_websocket(BlockedSend())
+    hub.add(slow)
+
+    for i in range(5):
+        hub.broadcast(f"{i}")
+        await asyncio.sleep(0)
+
+    slow_send.allowed.set()
+    await asyncio.sleep(0.01)
+    assert slow_send.text == ["0", "3", "4"]
+
+    hub.close()
+
+
+async def test_slow_consumer_disconnect():
+    hub = Hub(queue_size=1, policy=SlowConsumerPolicy.DISCONNECT)
+    slow, _, slow_send = await accepted_websocket(BlockedSend())
+    hub.add(slow, "room")
+
+    for i in range(3):
+        hub.broadcast(f"{i}")
+        await asyncio.sleep(0)
+
+    await asyncio.sleep(0.01)
+    assert slow not in hub
+    assert len(hub.group("room")) == 0
+    assert hub.disconnected == 1
+    assert slow_send.close_code == 1008
+
+
+async def test_connect_removes_on_disconnect():
+    hub = Hub()
+    websocket, receive, _ = await accepted_websocket()
+
+    async with hub.connect(websocket, "room"):
+        assert websocket in hub
+        receive.send({"type": "websocket.disconnect", "code": 1001})
+        while True:
+            await websocket.receive()
+
+    assert websocket not in hub
+    assert len(hub.group("room")) == 0
+
+
+async def test_disconnected_send_removes_connection():
+    class FailingSend(WebSocketSendInspector):
+        async def __call__(self, event):
+            if event["type"] == "websocket.send":
+                raise WebSocketDisconnectError(1006)
+            await super().__call__(event)
+
+    hub = Hub()
+    websocket, _, _ = await accepted_websocket(FailingSend())
+    hub.add(websocket)
+
+    hub.broadcast("message")
+    await asyncio.sleep(0)
+
+    assert websocket not in hub
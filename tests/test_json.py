@@ -0,0 +1,105 @@
+import copy
+import json
+
+import pytest
+
+from asgikit import _json
+from asgikit._json import JSON_OFFLOAD_STATS, JsonCodec, decode_json, encode_json
+from asgikit.requests import Request, read_json
+from asgikit.responses import Response, respond_json
+from tests.utils.asgi import HttpSendInspector
+
+
+@pytest.fixture(params=["thread", "process"])
+def offload(request, monkeypatch):
+    monkeypatch.setattr(_json, "JSON_OFFLOAD_THRESHOLD", 16)
+    monkeypatch.setattr(_json, "JSON_OFFLOAD_MODE", request.param)
+    monkeypatch.setattr(_json, "_OFFLOAD_EXECUTOR", None)
+    yield request.param
+    _json.shutdown_json_offload()
+
+
+async def test_small_payload_is_decoded_inline(offload):
+    decodes = JSON_OFFLOAD_STATS.decodes
+
+    assert await decode_json(b'{"a": 1}', "json") == {"a": 1}
+    assert JSON_OFFLOAD_STATS.decodes == decodes
+
+
+async def test_large_payload_is_decoded_offloaded(offload):
+    decodes = JSON_OFFLOAD_STATS.decodes
+    data = memoryview(b'{"message": "Hello, World!"}')
+
+    assert await decode_json(data, "orjson") == {"message": "Hello, World!"}
+    assert JSON_OFFLOAD_STATS.decodes == decodes + 1
+    assert JSON_OFFLOAD_STATS.decode_time_max > 0
+
+
+async def test_encode_is_offloaded_when_requested(offload):
+    encodes = JSON_OFFLOAD_STATS.encodes
+
+    assert await encode_json([1, 2], "orjson") == b"[1,2]"
+    assert JSON_OFFLOAD_STATS.encodes == encodes
+
+    assert await encode_json([1, 2], "orjson", offload=True) == b"[1,2]"
+    assert JSON_OFFLOAD_STATS.encodes == encodes + 1
+
+
+async def test_encode_offload_does_not_depend_on_threshold(offload, monkeypatch):
+    monkeypatch.setattr(_json, "JSON_OFFLOAD_THRESHOLD", 0)
+    encodes = JSON_OFFLOAD_STATS.encodes
+
+    assert await encode_json([1, 2], "orjson", offload=True) == b"[1,2]"
+    assert JSON_OFFLOAD_STATS.encodes == encodes + 1
+
+
+async def test_custom_codec_offloaded(offload):
+    codec = JsonCodec("custom", json.dumps, json.loads)
+
+    assert await encode_json({"a": 1}, codec, offload=True) == b'{"a": 1}'
+    assert await decode_json(b'{"message": "Hello, World!"}', codec) == {
+        "message": "Hello, World!"
+    }
+
+
+async def test_unpicklable_codec_is_not_sent_to_processes(offload):
+    def dumps(obj):
+        return json.dumps(obj)
+
+    codec = JsonCodec("local", dumps, json.loads)
+
+    if offload == "process":
+        with pytest.raises(ValueError):
+            await encode_json({"a": 1}, codec, offload=True)
+    else:
+        assert await encode_json({"a": 1}, codec, offload=True) == b'{"a": 1}'
+
+
+def test_shutdown_json_offload(monkeypatch):
+    monkeypatch.setattr(_json, "_OFFLOAD_EXECUTOR", None)
+
+    executor = _json._offload_executor()
+    _json.shutdown_json_offload()
+
+    assert _json._OFFLOAD_EXECUTOR is None
+    assert _json._offload_executor() is not executor
+    _json.shutdown_json_offload()
+
+
+async def test_read_and_respond_json_offloaded(offload):
+    body = b'{"items": [1, 2, 3, 4, 5, 6, 7, 8]}'
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    scope = {"type": "http", "headers": []}
+    decodes = JSON_OFFLOAD_STATS.decodes
+    content = await read_json(Request(copy.copy(scope), receive, None))
+    assert content == {"items": [1, 2, 3, 4, 5, 6, 7, 8]}
+    assert JSON_OFFLOAD_STATS.decodes == decodes + 1
+
+    inspector = HttpSendInspector()
+    await respond_json(
+        Response({"type": "http"}, None, inspector), content, offload=True
+    )
+    assert inspector.body.replace(" ", "") == '{"items":[1,2,3,4,5,6,7,8]}'
@@ -138,17 +138,17 @@ async def test_request_text():
 
 @pytest.mark.parametrize(
     "name, encoder",
-    [("json", None), ("orjson", "orjson"), ("orjson", "orjson.loads,orjson.dumps")],
+    [("json", "json"), ("orjson", "orjson"), ("orjson", "orjson.dumps,orjson.loads")],
     ids=["json", "orjson", "orjson-direct"],
 )
 async def test_request_json(name, encoder, monkeypatch):
-    if encoder:
-        monkeypatch.setenv("ASGIKIT_JSON_ENCODER", encoder)
+    monkeypatch.setenv("ASGIKIT_JSON_ENCODER", encoder)
 
     importlib.reload(sys.modules["asgikit._json"])
-    from asgikit._json import JSON_DECODER
+    from asgikit._json import JSON_DECODER, get_json_codec
 
     assert JSON_DECODER.__module__.startswith(name)
+    assert get_json_codec().name == encoder
 
     async def receive() -> HTTPRequestEvent:
         return {
@@ -170,6 +170,27 @@ def test_json_invalid_decoder_should_fail(encoder, monkeypatch):
         importlib.reload(sys.modules["asgikit._json"])
 
 
+def test_json_codec_auto_detect(monkeypatch):
+    monkeypatch.delenv("ASGIKIT_JSON_ENCODER", raising=False)
+
+    importlib.reload(sys.modules["asgikit._json"])
+    from asgikit._json import get_json_codec
+
+    # orjson is installed in the test environment
+    assert get_json_codec().name == "orjson"
+
+
+async def test_request_json_multiple_chunks():
+    async def receive() -> HTTPRequestEvent:
+        chunk = chunks.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    for codec in ("json", "orjson"):
+        chunks = [b'{"name": ', b'"Selva"}']
+        request = Request(copy.copy(SCOPE), receive, None)
+        assert await read_json(request, codec=codec) == {"name": "Selva"}
+
+
 async def test_request_invalid_json_should_fail():
     async def receive() -> HTTPRequestEvent:
         return {
@@ -1,22 +1,37 @@
 import asyncio
+import gzip
 import importlib
+import json
+import os
 import sys
+import time
 from http import HTTPStatus
 
 import pytest
 
+from asgikit.errors.http import ClientDisconnectError, ResponseAlreadyStartedError
 from asgikit.responses import (
+    STREAM_STATS,
     Response,
+    StaticResponse,
     respond_file,
     respond_json,
+    respond_json_stream,
     respond_redirect,
     respond_redirect_post_get,
+    respond_static,
     respond_status,
     respond_stream,
     respond_text,
     stream_writer,
 )
-from tests.utils.asgi import HttpSendInspector
+from asgikit.util import buffers
+from tests.utils.asgi import AsgiReceiveInspector, HttpSendInspector
+
+
+async def sleep_receive():
+    while True:
+        await asyncio.sleep(1000)
 
 
 async def test_respond_plain_text():
@@ -31,24 +46,64 @@ async def test_respond_plain_text():
 
 @pytest.mark.parametrize(
     "name, encoder",
-    [("json", None), ("orjson", "orjson"), ("orjson", "orjson.loads,orjson.dumps")],
+    [("json", "json"), ("orjson", "orjson"), ("orjson", "orjson.dumps,orjson.loads")],
     ids=["json", "orjson", "orjson-direct"],
 )
 async def test_respond_json(name, encoder, monkeypatch):
-    if encoder:
-        monkeypatch.setenv("ASGIKIT_JSON_ENCODER", encoder)
+    monkeypatch.setenv("ASGIKIT_JSON_ENCODER", encoder)
 
     importlib.reload(sys.modules["asgikit._json"])
-    from asgikit._json import JSON_ENCODER
+    from asgikit._json import get_json_codec
 
-    assert JSON_ENCODER.__module__.startswith(name)
+    assert get_json_codec().name == encoder
 
     inspector = HttpSendInspector()
     scope = {"type": "http"}
     response = Response(scope, None, inspector)
     await respond_json(response, {"message": "Hello, World!"})
 
-    assert inspector.body == """{"message": "Hello, World!"}"""
+    assert json.loads(inspector.body) == {"message": "Hello, World!"}
+
+
+async def test_respond_json_typed_defaults():
+    import dataclasses
+    import datetime
+    import decimal
+    import uuid
+
+    @dataclasses.dataclass
+    class Data:
+        value: int
+
+    content = {
+        "date": datetime.date(2024, 1, 2),
+        "uuid": uuid.UUID(int=1),
+        "decimal": decimal.Decimal("1.5"),
+        "status": HTTPStatus.OK,
+        "data": Data(1),
+    }
+
+    for codec in ("json", "orjson"):
+        inspector = HttpSendInspector()
+        response = Response({"type": "http"}, None, inspector)
+        await respond_json(response, content, codec=codec)
+
+        assert json.loads(inspector.body) == {
+            "date": "2024-01-02",
+            "uuid": "00000000-0000-0000-0000-000000000001",
+            "decimal": "1.5",
+            "status": 200,
+            "data": {"value": 1},
+        }
+
+
+async def test_respond_json_non_str_keys():
+    for codec in ("json", "orjson"):
+        inspector = HttpSendInspector()
+        response = Response({"type": "http"}, None, inspector)
+        await respond_json(response, {1: "one", 2.5: "half"}, codec=codec)
+
+        assert json.loads(inspector.body) == {"1": "one", "2.5": "half"}
 
 
 @pytest.mark.parametrize("encoder", ["invalid", "module.invalid"])
@@ -58,6 +113,40 @@ def test_json_invalid_decoder_should_fail(encoder, monkeypatch):
         importlib.reload(sys.modules["asgikit._json"])
 
 
+@pytest.mark.parametrize(
+    "mode, expected",
+    [
+        ("array", '[{"id":0},{"id":1},{"id":2},{"id":3},{"id":4}]'),
+        ("ndjson", '{"id":0}\n{"id":1}\n{"id":2}\n{"id":3}\n{"id":4}\n'),
+    ],
+)
+@pytest.mark.parametrize("is_async", [False, True], ids=["sync", "async"])
+async def test_respond_json_stream(mode, expected, is_async):
+    async def async_items():
+        for i in range(5):
+            yield {"id": i}
+
+    items = async_items() if is_async else ({"id": i} for i in range(5))
+
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), inspector)
+    await respond_json_stream(response, items, mode=mode, batch_size=2, codec="orjson")
+
+    assert inspector.body == expected
+    assert len(inspector.events["http.response.body"]) == 4
+
+
+@pytest.mark.parametrize("mode, expected", [("array", "[]"), ("ndjson", "")])
+async def test_respond_json_stream_empty(mode, expected):
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), inspector)
+    await respond_json_stream(response, [], mode=mode)
+
+    assert inspector.body == expected
+
+
 async def test_stream():
     async def stream_data():
         yield "Hello, "
@@ -71,6 +160,158 @@ async def test_stream():
     assert inspector.body == "Hello, World!"
 
 
+async def test_stream_from_sync_iterable():
+    import threading
+
+    threads = set()
+
+    def stream_data():
+        for i in range(100):
+            threads.add(threading.current_thread())
+            yield f"{i},"
+
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), inspector)
+    await respond_stream(response, stream_data(), thread_batch_size=10)
+
+    assert inspector.body == "".join(f"{i}," for i in range(100))
+    assert threading.main_thread() not in threads
+
+
+async def test_stream_from_sync_iterable_propagates_errors():
+    def stream_data():
+        yield "Hello, "
+        raise ValueError()
+
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), inspector)
+
+    with pytest.raises(ValueError):
+        await respond_stream(response, stream_data(), thread_batch_size=1)
+
+    assert inspector.body == "Hello, "
+
+
+async def test_stream_from_slow_sync_iterable_sends_first_chunk_early():
+    def stream_data():
+        for i in range(20):
+            time.sleep(0.05)
+            yield f"{i},"
+
+    first_chunk = None
+
+    async def send(message):
+        nonlocal first_chunk
+        if message["type"] == "http.response.body" and first_chunk is None:
+            first_chunk = time.monotonic()
+
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), send)
+
+    start = time.monotonic()
+    await respond_stream(response, stream_data())
+
+    assert first_chunk - start < 0.5
+
+
+async def test_write_buffer_protocol_objects():
+    import array
+
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), inspector)
+    buffer = bytearray(b"Hello, World!")
+
+    async with stream_writer(response) as write:
+        await write(buffer)
+        await write(memoryview(buffer)[:5])
+        await write(array.array("B", b"!"))
+
+    events = inspector.events["http.response.body"]
+    assert all(type(event["body"]) is bytes for event in events)
+    assert inspector.body == "Hello, World!Hello!"
+    assert write.bytes_sent == 19
+
+
+async def test_write_buffer_protocol_objects_zero_copy(monkeypatch):
+    import array
+
+    monkeypatch.setattr(buffers, "ZERO_COPY_BUFFERS", True)
+
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), inspector)
+    buffer = bytearray(b"Hello, World!")
+
+    async with stream_writer(response) as write:
+        await write(buffer)
+        await write(memoryview(buffer)[:5])
+        await write(array.array("B", b"!"))
+
+    events = inspector.events["http.response.body"]
+    assert events[0]["body"] is buffer
+    assert isinstance(events[1]["body"], memoryview)
+    assert inspector.body == "Hello, World!Hello!"
+    assert write.bytes_sent == 19
+
+
+async def test_respond_text_memoryview():
+    inspector = HttpSendInspector()
+    response = Response({"type": "http"}, None, inspector)
+    await respond_text(response, memoryview(b"Hello, World!"))
+
+    assert inspector.headers["content-length"] == "13"
+    assert inspector.body == "Hello, World!"
+
+
+async def test_stream_read_ahead():
+    produced = []
+
+    async def stream_data():
+        for i in range(10):
+            produced.append(i)
+            yield f"{i}"
+
+    send_allowed = asyncio.Event()
+    inspector = HttpSendInspector()
+
+    async def slow_send(event):
+        if event["type"] == "http.response.body":
+            await send_allowed.wait()
+        await inspector(event)
+
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), slow_send)
+    task = asyncio.create_task(respond_stream(response, stream_data(), read_ahead=3))
+
+    await asyncio.sleep(0.01)
+    send_allowed.set()
+
+    # one chunk is being sent, three are queued and the producer holds the next one
+    assert len(produced) == 5
+
+    await task
+
+    assert inspector.body == "0123456789"
+
+
+async def test_stream_read_ahead_propagates_errors():
+    async def stream_data():
+        yield "Hello, "
+        raise ValueError()
+
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), inspector)
+
+    with pytest.raises(ValueError):
+        await respond_stream(response, stream_data(), read_ahead=3)
+
+    assert inspector.body == "Hello, "
+
+
 async def test_stream_context_manager():
     inspector = HttpSendInspector()
     scope = {"type": "http", "http_version": "1.1"}
@@ -83,6 +324,79 @@ async def test_stream_context_manager():
     assert inspector.body == "Hello, World!"
 
 
+async def test_stream_writer_coalesces_writes():
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), inspector)
+
+    async with stream_writer(response, buffer_size=8) as write:
+        for _ in range(5):
+            await write("abc")
+        assert write.buffered == 6
+        await write.flush()
+        await write("abc")
+
+    chunks = [event["body"] for event in inspector.events["http.response.body"]]
+    assert chunks == [b"abcabcabc", b"abcabc", b"abc", b""]
+    assert (write.writes, write.events) == (6, 3)
+
+
+async def test_stream_writer_flushes_after_interval():
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), inspector)
+
+    async with stream_writer(response, buffer_size=1024, flush_interval=0.01) as write:
+        await write("Hello, ")
+        await write("World!")
+        await asyncio.sleep(0.05)
+        assert inspector.body == "Hello, World!"
+        assert write.events == 1
+
+
+async def test_respond_stream_cancels_producer_on_disconnect():
+    cleaned_up = asyncio.Event()
+
+    async def stream_data():
+        try:
+            yield "Hello, "
+            await asyncio.sleep(1000)
+            yield "World!"
+        finally:
+            cleaned_up.set()
+
+    receive = AsgiReceiveInspector()
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, receive, inspector)
+    response.content_length = 13
+
+    task = asyncio.create_task(respond_stream(response, stream_data()))
+    await asyncio.sleep(0.01)
+    receive.send({"type": "http.disconnect"})
+
+    with pytest.raises(ClientDisconnectError):
+        await asyncio.wait_for(task, 1)
+
+    assert cleaned_up.is_set()
+    assert inspector.body == "Hello, "
+    assert STREAM_STATS.cancelled >= 1
+
+
+async def test_stream_writer_not_cancelled_without_disconnect():
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), inspector)
+
+    async with stream_writer(response) as write:
+        await asyncio.sleep(0.01)
+        await write("Hello, World!")
+
+    assert not write.cancelled
+    assert write.bytes_sent == 13
+    assert write.bytes_saved is None
+
+
 async def test_respond_file(tmp_path):
     tmp_file = tmp_path / "tmp_file.txt"
     tmp_file.write_text("Hello, World!")
@@ -90,14 +404,216 @@ async def test_respond_file(tmp_path):
     inspector = HttpSendInspector()
     scope = {"type": "http", "http_version": "1.1"}
 
-    async def sleep_receive():
-        while True:
-            await asyncio.sleep(1000)
-
     response = Response(scope, sleep_receive, inspector)
     await respond_file(response, tmp_file)
 
     assert inspector.body == "Hello, World!"
+    assert inspector.headers["content-length"] == "13"
+    assert "etag" in inspector.headers
+    assert "last-modified" in inspector.headers
+
+
+async def test_respond_file_from_content_cache(tmp_path, monkeypatch):
+    from asgikit.util.file_cache import FileContentCache
+
+    monkeypatch.setattr(
+        "asgikit.responses.FILE_CONTENT_CACHE", FileContentCache(gzip=True)
+    )
+
+    tmp_file = tmp_path / "tmp_file.txt"
+    tmp_file.write_text("Hello, World!" * 10)
+
+    for _ in range(2):
+        inspector = HttpSendInspector()
+        scope = {
+            "type": "http",
+            "http_version": "1.1",
+            "headers": [(b"accept-encoding", b"gzip, deflate")],
+        }
+        response = Response(scope, None, inspector)
+        await respond_file(response, tmp_file)
+
+        assert len(inspector.events["http.response.body"]) == 1
+        assert inspector.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(inspector._body) == b"Hello, World!" * 10
+
+
+async def test_respond_file_gzip_variant_has_distinct_etag(tmp_path, monkeypatch):
+    from asgikit.util.file_cache import FileContentCache, FileMetadata
+
+    monkeypatch.setattr(
+        "asgikit.responses.FILE_CONTENT_CACHE", FileContentCache(gzip=True)
+    )
+
+    tmp_file = tmp_path / "tmp_file.txt"
+    tmp_file.write_text("Hello, World!" * 10)
+    etag = FileMetadata.from_stat(tmp_file, tmp_file.stat()).etag
+
+    etags = {}
+    for accept_encoding in (b"gzip", b"identity"):
+        inspector = HttpSendInspector()
+        scope = {
+            "type": "http",
+            "http_version": "1.1",
+            "headers": [(b"accept-encoding", accept_encoding)],
+        }
+        response = Response(scope, None, inspector)
+        await respond_file(response, tmp_file)
+        etags[accept_encoding] = inspector.headers["etag"]
+
+    assert etags[b"identity"] == etag
+    assert etags[b"gzip"] == f'{etag[:-1]}-gzip"'
+
+
+@pytest.mark.parametrize("use_mmap", [False, True], ids=["read", "mmap"])
+async def test_respond_file_streams_fixed_size_chunks(use_mmap, tmp_path, monkeypatch):
+    from asgikit.util.file_cache import FileContentCache
+
+    monkeypatch.setattr(
+        "asgikit.responses.FILE_CONTENT_CACHE", FileContentCache(max_file_size=0)
+    )
+    monkeypatch.setattr("asgikit.responses.RESPOND_FILE_MMAP", use_mmap)
+    monkeypatch.setattr("asgikit.responses.AsyncFile.CHUNK_SIZE", 1024)
+
+    data = bytes(range(256)) * 10
+    tmp_file = tmp_path / "tmp_file.bin"
+    tmp_file.write_bytes(data)
+
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+
+    response = Response(scope, sleep_receive, inspector)
+    await respond_file(response, tmp_file)
+
+    chunks = [event["body"] for event in inspector.events["http.response.body"]]
+    assert [len(chunk) for chunk in chunks] == [1024, 1024, 512, 0]
+    assert bytes(inspector._body) == data
+
+
+async def test_respond_file_zerocopysend(tmp_path):
+    tmp_file = tmp_path / "tmp_file.txt"
+    tmp_file.write_text("Hello, World!")
+
+    inspector = HttpSendInspector()
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "extensions": {"http.response.zerocopysend": {}},
+    }
+
+    response = Response(scope, None, inspector)
+    await respond_file(response, tmp_file, offset=7, count=5)
+
+    event = inspector.events["http.response.zerocopysend"][0]
+    assert (event["offset"], event["count"]) == (7, 5)
+    assert os.pread(event["file"].fileno(), event["count"], event["offset"]) == b"World"
+    assert inspector.status == HTTPStatus.PARTIAL_CONTENT
+    assert inspector.headers["content-length"] == "5"
+    assert inspector.headers["content-range"] == "bytes 7-11/13"
+
+
+@pytest.mark.parametrize("use_mmap", [False, True], ids=["read", "mmap"])
+async def test_respond_file_range(use_mmap, tmp_path, monkeypatch):
+    from asgikit.util.file_cache import FileContentCache
+
+    monkeypatch.setattr(
+        "asgikit.responses.FILE_CONTENT_CACHE", FileContentCache(max_file_size=0)
+    )
+    monkeypatch.setattr("asgikit.responses.RESPOND_FILE_MMAP", use_mmap)
+
+    tmp_file = tmp_path / "tmp_file.txt"
+    tmp_file.write_text("Hello, World!")
+
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+
+    response = Response(scope, sleep_receive, inspector)
+    await respond_file(response, tmp_file, offset=7)
+
+    assert inspector.body == "World!"
+    assert inspector.status == HTTPStatus.PARTIAL_CONTENT
+
+
+async def test_respond_file_range_past_end_is_limited(tmp_path):
+    tmp_file = tmp_path / "tmp_file.txt"
+    tmp_file.write_text("Hello, World!")
+
+    inspector = HttpSendInspector()
+    response = Response({"type": "http", "http_version": "1.1"}, None, inspector)
+    await respond_file(response, tmp_file, offset=7, count=100)
+
+    assert inspector.body == "World!"
+    assert inspector.headers["content-length"] == "6"
+    assert inspector.headers["content-range"] == "bytes 7-12/13"
+
+
+@pytest.mark.parametrize(
+    "offset,count",
+    [(0, 0), (0, -1), (-1, None), (13, None), (14, 1)],
+    ids=["zero-count", "negative-count", "negative-offset", "at-end", "past-end"],
+)
+async def test_respond_file_invalid_range(offset, count, tmp_path):
+    tmp_file = tmp_path / "tmp_file.txt"
+    tmp_file.write_text("Hello, World!")
+
+    inspector = HttpSendInspector()
+    response = Response({"type": "http", "http_version": "1.1"}, None, inspector)
+
+    with pytest.raises(ValueError):
+        await respond_file(response, tmp_file, offset=offset, count=count)
+
+    assert not response.is_started
+
+
+async def test_respond_static():
+    static = StaticResponse("Not Found", status=HTTPStatus.NOT_FOUND)
+
+    for _ in range(2):
+        inspector = HttpSendInspector()
+        response = Response({"type": "http"}, None, inspector)
+        await respond_static(response, static)
+
+        assert inspector.status == HTTPStatus.NOT_FOUND
+        assert inspector.headers["content-type"] == "text/plain; charset=utf-8"
+        assert inspector.headers["content-length"] == "9"
+        assert inspector.body == "Not Found"
+        assert response.is_started
+        assert response.is_finished
+
+
+async def test_respond_static_messages_are_not_shared():
+    static = StaticResponse("OK")
+
+    def cors_send(send, origin: bytes):
+        async def wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"].append((b"access-control-allow-origin", origin))
+            await send(message)
+
+        return wrapper
+
+    for origin in (b"https://a", b"https://b"):
+        inspector = HttpSendInspector()
+        response = Response({"type": "http"}, None, cors_send(inspector, origin))
+        await respond_static(response, static)
+
+        start = inspector.events["http.response.start"][0]
+        assert [
+            value
+            for name, value in start["headers"]
+            if name == b"access-control-allow-origin"
+        ] == [origin]
+
+    assert len(static.headers) == 2
+
+
+async def test_respond_static_already_started():
+    inspector = HttpSendInspector()
+    response = Response({"type": "http"}, None, inspector)
+    await response.start()
+
+    with pytest.raises(ResponseAlreadyStartedError):
+        await respond_static(response, StaticResponse(b"ok"))
 
 
 async def test_respond_status():
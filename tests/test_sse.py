@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from asgikit.responses import Response
+from asgikit.sse import SlowSubscriberPolicy, SSEChannel, encode_event, respond_sse
+from tests.utils.asgi import AsgiReceiveInspector, HttpSendInspector
+
+
+def test_encode_event():
+    assert encode_event("line1\nline2", event="update", id="1") == (
+        b"id: 1\nevent: update\ndata: line1\ndata: line2\n\n"
+    )
+
+
+def test_encode_event_keeps_empty_lines():
+    assert encode_event("line1\r\n\nline2\n") == (
+        b"data: line1\ndata: \ndata: line2\ndata: \n\n"
+    )
+    assert encode_event("") == b"data: \n\n"
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [{"id": "1\ndata: x"}, {"id": "1\0"}, {"event": "update\r"}],
+    ids=["id-line-break", "id-null", "event-line-break"],
+)
+def test_encode_event_rejects_invalid_fields(fields):
+    with pytest.raises(ValueError):
+        encode_event("data", **fields)
+
+
+async def test_respond_sse_from_iterable():
+    async def events():
+        yield "first"
+        yield encode_event("second", event="update")
+
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), inspector)
+    await respond_sse(response, events())
+
+    assert inspector.headers["content-type"] == "text/event-stream; charset=utf-8"
+    assert inspector.body == "data: first\n\nevent: update\ndata: second\n\n"
+
+
+async def test_respond_sse_sends_heartbeat():
+    async def events():
+        await asyncio.sleep(0.05)
+        yield "data"
+
+    inspector = HttpSendInspector()
+    scope = {"type": "http", "http_version": "1.1"}
+    response = Response(scope, AsgiReceiveInspector(), inspector)
+    await respond_sse(response, events(), heartbeat_interval=0.01)
+
+    assert inspector.body.startswith(":\n\n")
+    assert inspector.body.endswith("data: data\n\n")
+
+
+async def test_channel_fan_out_and_replay():
+    channel = SSEChannel(history_size=10)
+    subscription = channel.subscribe()
+
+    channel.publish("a")
+    channel.publish("b")
+    assert await anext(subscription) == b"id: 1\ndata: a\n\nid: 2\ndata: b\n\n"
+
+    resumed = channel.subscribe(last_event_id="1")
+    assert await anext(resumed) == b"id: 2\ndata: b\n\n"
+    assert channel.subscribers == 2
+
+    channel.close()
+    assert channel.subscribers == 0
+
+
+async def test_channel_drops_slow_subscriber():
+    channel = SSEChannel(queue_size=2, policy=SlowSubscriberPolicy.DROP)
+    subscription = channel.subscribe()
+
+    for data in ("a", "b", "c"):
+        channel.publish(data)
+
+    assert subscription.closed
+    assert channel.subscribers == 0
+
+
+async def test_channel_conflates_slow_subscriber():
+    channel = SSEChannel(queue_size=2, policy=SlowSubscriberPolicy.CONFLATE)
+    subscription = channel.subscribe()
+
+    for data in ("a", "b", "c"):
+        channel.publish(data)
+
+    assert await anext(subscription) == b"id: 2\ndata: b\n\nid: 3\ndata: c\n\n"
+
+
+async def test_respond_sse_from_channel():
+    channel = SSEChannel()
+    channel.publish("old")
+
+    inspector = HttpSendInspector()
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "headers": [(b"last-event-id", b"1")],
+    }
+    response = Response(scope, AsgiReceiveInspector(), inspector)
+    task = asyncio.create_task(respond_sse(response, channel))
+
+    await asyncio.sleep(0)
+    channel.publish("new")
+    await asyncio.sleep(0)
+    channel.close()
+    await task
+
+    assert inspector.body == "id: 2\ndata: new\n\n"
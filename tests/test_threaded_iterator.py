@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from asgikit.util.threaded_iterator import ThreadedIterator
+
+
+async def test_iterate_in_batches():
+    items = [item async for item in ThreadedIterator(range(10), batch_size=3)]
+    assert items == list(range(10))
+
+
+async def test_close_stops_worker_thread():
+    closed = threading.Event()
+
+    def produce():
+        try:
+            i = 0
+            while True:
+                yield i
+                i += 1
+        finally:
+            closed.set()
+
+    iterator = ThreadedIterator(produce(), batch_size=2, max_batches=1)
+    assert await anext(iterator) == 0
+    await iterator.aclose()
+
+    assert await asyncio.to_thread(closed.wait, 1)
+
+
+async def test_error_is_raised_once():
+    def produce():
+        yield 1
+        raise ValueError()
+
+    iterator = ThreadedIterator(produce(), batch_size=1)
+    assert await anext(iterator) == 1
+
+    with pytest.raises(ValueError):
+        await anext(iterator)
+
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(anext(iterator), 1)
+
+
+async def test_close_unblocks_worker_putting_last_batch():
+    iterator = ThreadedIterator(range(2), batch_size=1, max_batches=1)
+    assert await anext(iterator) == 0
+    # the worker is blocked putting the end of the iterable in the full queue
+    await asyncio.sleep(0.01)
+
+    await iterator.aclose()
+    await asyncio.wait_for(iterator._task, 1)
+
+    with pytest.raises(StopAsyncIteration):
+        await anext(iterator)
+
+
+async def test_slow_iterable_is_not_held_for_full_batch():
+    def produce():
+        for i in range(20):
+            time.sleep(0.05)
+            yield i
+
+    iterator = ThreadedIterator(produce(), batch_size=64)
+    start = time.monotonic()
+    assert await anext(iterator) == 0
+    assert time.monotonic() - start < 0.5
+
+    await iterator.aclose()
+
+
+async def test_partial_batch_is_put_after_max_delay():
+    def produce():
+        for i in range(3):
+            time.sleep(0.02)
+            yield i
+
+    iterator = ThreadedIterator(produce(), batch_size=64, max_delay=0)
+    assert await anext(iterator) == 0
+    # the consumer is not waiting while the rest of the iterable is consumed
+    await asyncio.wait_for(iterator._task, 1)
+
+    # one batch for each remaining item and the end of the iterable
+    assert iterator._queue.qsize() == 3
+    assert [item async for item in iterator] == [1, 2]
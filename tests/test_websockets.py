@@ -1,5 +1,29 @@
+import asyncio
+import time
+
+import pytest
+
+from asgikit.errors.websocket import (
+    WebSocketDisconnectError,
+    WebSocketLimitError,
+    WebSocketQueueFullError,
+    WebSocketStateError,
+    WebSocketTimeoutError,
+)
 from asgikit.requests import Request
-from tests.utils.asgi import AsgiReceiveInspector, WebSocketSendInspector
+from asgikit.util import buffers
+from asgikit.websockets import (
+    WEBSOCKET_STATS,
+    ConflatingSender,
+    RateLimitAction,
+    WebSocket,
+)
+from tests.utils.asgi import (
+    AsgiReceiveInspector,
+    BlockedSend,
+    WebSocketSendInspector,
+    accepted_websocket,
+)
 
 
 async def test_websocket():
@@ -34,3 +58,441 @@ async def test_non_websocket_request():
     request = Request(scope, None, None)
     ws = request.websocket
     assert ws is None
+
+
+async def test_websocket_send_buffer():
+    scope = {"type": "websocket", "subprotocols": []}
+    receive = AsgiReceiveInspector()
+    send = WebSocketSendInspector()
+
+    ws = Request(scope, receive, send).websocket
+    receive.send({"type": "websocket.connect"})
+    await ws.accept()
+
+    data = bytearray(b"data")
+    await ws.send(data)
+    await ws.send(memoryview(data)[:2])
+
+    assert send.bytes == [b"data", b"da"]
+    assert all(type(item) is bytes for item in send.bytes)
+
+
+async def test_websocket_send_buffer_zero_copy(monkeypatch):
+    monkeypatch.setattr(buffers, "ZERO_COPY_BUFFERS", True)
+
+    scope = {"type": "websocket", "subprotocols": []}
+    receive = AsgiReceiveInspector()
+    send = WebSocketSendInspector()
+
+    ws = Request(scope, receive, send).websocket
+    receive.send({"type": "websocket.connect"})
+    await ws.accept()
+
+    data = bytearray(b"data")
+    await ws.send(data)
+    await ws.send(memoryview(data)[:2])
+    await ws.send("text")
+
+    assert send.bytes == [data, memoryview(b"da")]
+    assert send.bytes[0] is data
+    assert send.text == ["text"]
+
+
+async def test_websocket_send_invalid_type():
+    scope = {"type": "websocket", "subprotocols": []}
+    receive = AsgiReceiveInspector()
+    send = WebSocketSendInspector()
+
+    ws = Request(scope, receive, send).websocket
+    receive.send({"type": "websocket.connect"})
+    await ws.accept()
+
+    with pytest.raises(TypeError):
+        await ws.send(1)
+
+
+async def test_websocket_outbound_queue():
+    send = BlockedSend()
+    ws, _, _ = await accepted_websocket(send)
+    outbound = ws.enable_outbound(max_size=4, high_water_mark=3, low_water_mark=1)
+
+    for i in range(4):
+        ws.send_nowait(f"{i}")
+    assert outbound.depth == 4
+    assert not outbound.writable
+
+    with pytest.raises(WebSocketQueueFullError):
+        ws.send_nowait("full")
+
+    send.allowed.set()
+    await outbound.join()
+    assert send.text == ["0", "1", "2", "3"]
+    assert outbound.depth == 0
+    assert outbound.writable
+
+
+async def test_websocket_outbound_send_waits_for_low_water_mark():
+    send = BlockedSend()
+    ws, _, _ = await accepted_websocket(send)
+    ws.enable_outbound(max_size=4, high_water_mark=2, low_water_mark=0)
+
+    await ws.send("0")
+    await ws.send("1")
+
+    blocked = asyncio.create_task(ws.send("2"))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    send.allowed.set()
+    await blocked
+    await ws.close()
+
+    assert send.text == ["0", "1", "2"]
+    assert send.close_code == 1000
+
+
+async def test_websocket_outbound_stops_on_disconnect():
+    send = BlockedSend()
+    ws, receive, _ = await accepted_websocket(send)
+    outbound = ws.enable_outbound()
+    ws.send_nowait("data")
+
+    receive.send({"type": "websocket.disconnect", "code": 1001})
+    with pytest.raises(WebSocketDisconnectError):
+        await ws.receive()
+
+    assert outbound.depth == 0
+    with pytest.raises(WebSocketStateError):
+        ws.send_nowait("data")
+
+
+async def test_conflating_sender_keeps_latest_value():
+    send = BlockedSend()
+    ws, _, _ = await accepted_websocket(send)
+    sender = ConflatingSender(ws)
+
+    sender.update("a", "a1")
+    await asyncio.sleep(0)
+    # "a1" is being sent, the following updates are conflated
+    sender.update("a", "a2")
+    sender.update("b", "b1")
+    sender.update("a", "a3")
+    assert sender.pending == 2
+    assert sender.conflated == 1
+
+    send.allowed.set()
+    await asyncio.sleep(0.01)
+
+    assert send.text == ["a1", "a3", "b1"]
+    sender.close()
+
+
+async def test_conflating_sender_with_interval():
+    send = WebSocketSendInspector()
+    ws, _, _ = await accepted_websocket(send)
+    sender = ConflatingSender(ws, interval=0.05)
+
+    sender.update("price", "1")
+    await asyncio.sleep(0.01)
+    for i in range(2, 6):
+        sender.update("price", f"{i}")
+        await asyncio.sleep(0)
+
+    assert send.text == ["1"]
+    await asyncio.sleep(0.06)
+    assert send.text == ["1", "5"]
+
+    sender.update("price", "6")
+    await sender.flush()
+    assert send.text == ["1", "5", "6"]
+
+
+async def test_conflating_sender_flush_delivers_pending_updates():
+    send = BlockedSend()
+    ws, _, _ = await accepted_websocket(send)
+    sender = ConflatingSender(ws)
+
+    sender.update("a", "a1")
+    sender.update("b", "b1")
+    await asyncio.sleep(0)
+    # "a1" is being sent, "b1" is in the same batch
+    sender.update("a", "a2")
+
+    flushed = asyncio.create_task(sender.flush())
+    await asyncio.sleep(0.01)
+    assert not flushed.done()
+
+    send.allowed.set()
+    await flushed
+
+    assert send.text == ["a1", "b1", "a2"]
+    assert sender.closed
+
+
+async def test_conflating_sender_stops_when_closed():
+    send = WebSocketSendInspector()
+    ws, _, _ = await accepted_websocket(send)
+    sender = ConflatingSender(ws)
+
+    await ws.close()
+    sender.update("topic", "data")
+    await asyncio.sleep(0)
+
+    assert sender.closed
+    with pytest.raises(WebSocketStateError):
+        sender.update("topic", "data")
+
+
+async def test_websocket_receive_timeout():
+    send = WebSocketSendInspector()
+    ws, _, _ = await accepted_websocket(send)
+    timeouts = WEBSOCKET_STATS.receive_timeouts
+
+    with pytest.raises(WebSocketTimeoutError):
+        await ws.receive(timeout=0.01)
+
+    assert ws.state == WebSocket.State.CLOSED
+    assert send.close_code == 1001
+    assert send.close_reason == "receive timeout"
+    assert WEBSOCKET_STATS.receive_timeouts == timeouts + 1
+
+
+async def test_websocket_idle_timeout_ignores_sent_messages():
+    send = WebSocketSendInspector()
+    ws, _, _ = await accepted_websocket(send)
+    ws.idle_timeout = 0.05
+    timeouts = WEBSOCKET_STATS.idle_timeouts
+
+    async def keep_sending():
+        for _ in range(10):
+            await asyncio.sleep(0.02)
+            await ws.send("data")
+
+    task = asyncio.create_task(keep_sending())
+    with pytest.raises(WebSocketTimeoutError):
+        await ws.receive()
+    task.cancel()
+
+    assert send.close_reason == "idle timeout"
+    assert WEBSOCKET_STATS.idle_timeouts == timeouts + 1
+
+
+async def test_websocket_idle_timeout_starts_when_waiting():
+    send = WebSocketSendInspector()
+    ws, receive, _ = await accepted_websocket(send)
+    ws.idle_timeout = 0.02
+
+    receive.send({"type": "websocket.receive", "text": "pending"})
+    await asyncio.sleep(0.05)
+
+    assert await ws.receive() == "pending"
+    assert ws.state == WebSocket.State.ACCEPTED
+
+
+async def test_websocket_keepalive():
+    send = WebSocketSendInspector()
+    ws, receive, _ = await accepted_websocket(send)
+    ws.enable_keepalive(interval=0.01, timeout=0.02)
+
+    await asyncio.sleep(0.015)
+    assert send.text == ["ping"]
+
+    receive.send({"type": "websocket.receive", "text": "pong"})
+    receive.send({"type": "websocket.receive", "text": "message"})
+    assert await ws.receive() == "message"
+    assert ws.state == WebSocket.State.ACCEPTED
+
+    timeouts = WEBSOCKET_STATS.keepalive_timeouts
+    await asyncio.sleep(0.05)
+
+    assert ws.state == WebSocket.State.CLOSED
+    assert send.close_code == 1001
+    assert send.close_reason == "keepalive timeout"
+    assert WEBSOCKET_STATS.keepalive_timeouts == timeouts + 1
+
+
+async def test_websocket_receive_empty_text():
+    send = WebSocketSendInspector()
+    ws, receive, _ = await accepted_websocket(send)
+
+    receive.send({"type": "websocket.receive", "text": ""})
+    assert await ws.receive() == ""
+
+
+async def test_websocket_async_iteration():
+    send = WebSocketSendInspector()
+    ws, receive, _ = await accepted_websocket(send)
+
+    for event in reversed(
+        [
+            {"type": "websocket.receive", "text": "text"},
+            {"type": "websocket.receive", "bytes": b"bytes"},
+            {"type": "websocket.disconnect", "code": 1000},
+        ]
+    ):
+        receive.send(event)
+
+    assert [message async for message in ws] == ["text", b"bytes"]
+    assert ws.state == WebSocket.State.CLOSED
+
+
+@pytest.mark.parametrize(
+    "method, expected",
+    [("iter_text", ["text", "bytes"]), ("iter_bytes", [b"text", b"bytes"])],
+)
+async def test_websocket_iter_typed(method, expected):
+    send = WebSocketSendInspector()
+    ws, receive, _ = await accepted_websocket(send)
+
+    for event in reversed(
+        [
+            {"type": "websocket.receive", "text": "text"},
+            {"type": "websocket.receive", "bytes": b"bytes"},
+            {"type": "websocket.disconnect", "code": 1000},
+        ]
+    ):
+        receive.send(event)
+
+    assert [message async for message in getattr(ws, method)()] == expected
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson"])
+async def test_websocket_json(codec):
+    send = WebSocketSendInspector()
+    ws, receive, _ = await accepted_websocket(send)
+
+    for event in reversed(
+        [
+            {"type": "websocket.receive", "text": '{"id": 1}'},
+            {"type": "websocket.receive", "bytes": b'{"id": 2}'},
+            {"type": "websocket.disconnect", "code": 1000},
+        ]
+    ):
+        receive.send(event)
+
+    assert [item async for item in ws.iter_json(codec=codec)] == [{"id": 1}, {"id": 2}]
+
+
+async def test_websocket_send_json_and_encoded():
+    send = WebSocketSendInspector()
+    ws, _, _ = await accepted_websocket(send)
+
+    await ws.send_json({"id": 1}, codec="orjson")
+    await ws.send_json({"id": 2}, codec="orjson", binary=True)
+
+    message = WebSocket.encode_json({"id": 3}, codec="orjson")
+    await ws.send_encoded(message)
+
+    assert send.text == ['{"id":1}', '{"id":3}']
+    assert send.bytes == [b'{"id":2}']
+    assert send.events["websocket.send"][-1] is message
+
+
+def _receive_messages(receive, *messages):
+    for data in reversed(messages):
+        receive.send({"type": "websocket.receive", "text": data})
+
+
+async def test_websocket_rate_limit_delay():
+    send = WebSocketSendInspector()
+    ws, receive, _ = await accepted_websocket(send)
+    ws.set_limits(messages_per_second=100, burst=0.01)
+
+    _receive_messages(receive, "a", "b", "c")
+
+    start = time.monotonic()
+    assert [await ws.receive() for _ in range(3)] == ["a", "b", "c"]
+    assert time.monotonic() - start >= 0.015
+
+
+async def test_websocket_rate_limit_drop():
+    send = WebSocketSendInspector()
+    ws, receive, _ = await accepted_websocket(send)
+    ws.set_limits(bytes_per_second=4, action=RateLimitAction.DROP)
+
+    dropped = WEBSOCKET_STATS.dropped
+    _receive_messages(receive, "abc", "def", "g")
+
+    assert await ws.receive() == "abc"
+    assert await ws.receive() == "g"
+    assert WEBSOCKET_STATS.dropped == dropped + 1
+
+
+async def test_websocket_rate_limit_close():
+    send = WebSocketSendInspector()
+    ws, receive, _ = await accepted_websocket(send)
+    ws.set_limits(messages_per_second=1, action=RateLimitAction.CLOSE)
+
+    _receive_messages(receive, "a", "b")
+
+    assert await ws.receive() == "a"
+    with pytest.raises(WebSocketLimitError):
+        await ws.receive()
+
+    assert send.close_code == 1008
+    assert ws.state == WebSocket.State.CLOSED
+
+
+async def test_websocket_max_message_size():
+    send = WebSocketSendInspector()
+    ws, receive, _ = await accepted_websocket(send)
+    ws.set_limits(max_message_size=4)
+
+    _receive_messages(receive, "ação")
+
+    # size is counted in utf-8 bytes
+    with pytest.raises(WebSocketLimitError):
+        await ws.receive()
+
+    assert send.close_code == 1009
+
+
+async def test_websocket_set_limits_keeps_max_message_size(monkeypatch):
+    monkeypatch.setattr(WebSocket, "MAX_MESSAGE_SIZE", 4)
+    send = WebSocketSendInspector()
+    ws, receive, _ = await accepted_websocket(send)
+    ws.set_limits(messages_per_second=100)
+
+    _receive_messages(receive, "large")
+
+    with pytest.raises(WebSocketLimitError):
+        await ws.receive()
+
+    assert send.close_code == 1009
+
+
+async def test_websocket_close_waits_for_outbound_with_timeout():
+    send = BlockedSend()
+    ws, _, _ = await accepted_websocket(send)
+    outbound = ws.enable_outbound()
+    ws.send_nowait("data")
+
+    await asyncio.wait_for(ws.close(timeout=0.01), 1)
+
+    assert send.text == []
+    assert send.close_code == 1000
+    assert outbound.depth == 0
+
+
+async def test_websocket_outbound_bounded_with_concurrent_senders():
+    send = BlockedSend()
+    ws, _, _ = await accepted_websocket(send)
+    outbound = ws.enable_outbound(max_size=4, batch_size=1)
+
+    max_depth = 0
+
+    async def sender(i: int):
+        nonlocal max_depth
+        await ws.send(f"{i}")
+        max_depth = max(max_depth, outbound.depth)
+
+    senders = [asyncio.create_task(sender(i)) for i in range(50)]
+    await asyncio.sleep(0.01)
+    assert outbound.depth <= outbound.max_size
+
+    send.allowed.set()
+    await asyncio.gather(*senders)
+    await outbound.join()
+
+    assert max_depth <= outbound.max_size
+    assert sorted(send.text, key=int) == [f"{i}" for i in range(50)]
@@ -1,3 +1,4 @@
+import asyncio
 from asyncio.locks import Event
 from collections import defaultdict
 from collections.abc import AsyncIterable, Awaitable, Callable
@@ -5,6 +6,8 @@ from collections.abc import AsyncIterable, Awaitable, Callable
 from asgiref.typing import ASGIReceiveEvent, ASGISendEvent, HTTPRequestEvent
 
 from asgikit.headers import Headers
+from asgikit.requests import Request
+from asgikit.websockets import WebSocket
 
 
 async def asgi_receive_from_stream(
@@ -30,9 +33,9 @@ class AsgiReceiveInspector:
         self._sync.set()
 
     async def __call__(self) -> ASGIReceiveEvent:
-        if not self.events:
-            await self._sync.wait()
+        while not self.events:
             self._sync.clear()
+            await self._sync.wait()
 
         return self.events.pop()
 
@@ -64,6 +67,32 @@ class WebSocketSendInspector:
         self.events[event["type"]].append(event)
 
 
+class BlockedSend(WebSocketSendInspector):
+    """Send inspector that holds messages until `allowed` is set"""
+
+    def __init__(self):
+        super().__init__()
+        self.allowed = asyncio.Event()
+
+    async def __call__(self, event: ASGISendEvent):
+        if event["type"] == "websocket.send":
+            await self.allowed.wait()
+        await super().__call__(event)
+
+
+async def accepted_websocket(
+    send: WebSocketSendInspector = None,
+) -> tuple[WebSocket, AsgiReceiveInspector, WebSocketSendInspector]:
+    scope = {"type": "websocket", "subprotocols": []}
+    receive = AsgiReceiveInspector()
+    send = send or WebSocketSendInspector()
+
+    websocket = Request(scope, receive, send).websocket
+    receive.send({"type": "websocket.connect"})
+    await websocket.accept()
+    return websocket, receive, send
+
+
 class HttpSendInspector:
     def __init__(self):
         self.events: dict[str, list[ASGISendEvent]] = defaultdict(list)